@@ -4,18 +4,23 @@ Anthropic API client module with cost tracking and budget safety.
 Handles all API calls to Claude with retry logic and spending limits.
 """
 
+import asyncio
+import hashlib
+import random
+import threading
 import time
 import logging
-from dataclasses import dataclass
-from typing import Optional, Tuple
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import re
 
 from config import (
     MODEL_NAME,
+    PER_TOKEN_PRICING,
     BUDGET_CEILING_USD,
     BUDGET_WARNING_THRESHOLD,
-    API_DELAY_SECONDS,
     MAX_RETRIES,
+    BATCH_PRICE_MULTIPLIER,
     calculate_cost
 )
 
@@ -23,6 +28,65 @@ from config import (
 logger = logging.getLogger(__name__)
 
 
+# Shared SDK clients, one per API key, so all APIClient instances reuse
+# the same httpx connection pool and TLS session
+_SHARED_CLIENTS: Dict[str, Any] = {}
+_SHARED_ASYNC_CLIENTS: Dict[str, Any] = {}
+
+_BETA_HEADERS = {"anthropic-beta": "prompt-caching-2024-07-31"}
+
+# Simulation helpers (dry-run mode)
+_LETTERS = "ABCDEFGHIJ"
+_rng = random.Random()
+
+
+def _pool_limits():
+    """Connection pool limits shared by the sync and async clients."""
+    import httpx
+    return httpx.Limits(
+        max_connections=32,
+        max_keepalive_connections=16,
+        keepalive_expiry=60
+    )
+
+
+def _http2_available() -> bool:
+    """True when httpx's HTTP/2 extra (the h2 package) is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _get_client(api_key: str):
+    """Lazily create (or reuse) the shared anthropic.Anthropic client."""
+    if api_key not in _SHARED_CLIENTS:
+        import anthropic
+        import httpx
+        _SHARED_CLIENTS[api_key] = anthropic.Anthropic(
+            api_key=api_key,
+            default_headers=_BETA_HEADERS,
+            # HTTP/2 multiplexes concurrent calls over one connection
+            http_client=httpx.Client(limits=_pool_limits(), http2=_http2_available())
+        )
+    return _SHARED_CLIENTS[api_key]
+
+
+def _get_async_client(api_key: str):
+    """Lazily create (or reuse) the shared anthropic.AsyncAnthropic client."""
+    if api_key not in _SHARED_ASYNC_CLIENTS:
+        import anthropic
+        import httpx
+        _SHARED_ASYNC_CLIENTS[api_key] = anthropic.AsyncAnthropic(
+            api_key=api_key,
+            default_headers=_BETA_HEADERS,
+            # HTTP/2 multiplexes concurrent calls over one connection
+            http_client=httpx.AsyncClient(limits=_pool_limits(), http2=_http2_available())
+        )
+    return _SHARED_ASYNC_CLIENTS[api_key]
+
+
 @dataclass
 class APIResponse:
     """Response from an API call."""
@@ -45,29 +109,47 @@ class APIClient:
     Tracks cumulative spend and enforces budget ceiling.
     """
     
-    def __init__(self, api_key: str, dry_run: bool = False):
+    def __init__(
+        self,
+        api_key: str,
+        dry_run: bool = False,
+        cache_enabled: bool = True,
+        persistent_cache: bool = False
+    ):
         """
         Initialize the API client.
-        
+
         Args:
             api_key: Anthropic API key
             dry_run: If True, simulate API calls without actually calling
+            cache_enabled: If True, memoize responses by (model, system, user)
+            persistent_cache: If True, also persist responses to SQLite so
+                identical prompts (e.g. the baseline condition) skip the
+                API across runs
         """
         self.api_key = api_key
         self.dry_run = dry_run
         self.cumulative_cost = 0.0
         self.total_calls = 0
         self.budget_warning_issued = False
+        self.cache_enabled = cache_enabled
+        self.cache_hits = 0
+        self._response_cache: Dict[str, APIResponse] = {}
+        # Guards cost/call counters when call() is driven from worker threads
+        self._cost_lock = threading.Lock()
+        self._persistent_cache = None
+        if persistent_cache:
+            from response_cache import ResponseCache
+            self._persistent_cache = ResponseCache()
         
         if not dry_run:
             try:
-                import anthropic
-                self.client = anthropic.Anthropic(api_key=api_key)
+                self.client = _get_client(api_key)
             except ImportError:
                 raise ImportError(
                     "anthropic package is required. Install with: pip install anthropic"
                 )
-    
+
     def check_budget(self, estimated_cost: float = 0.01) -> None:
         """
         Check if making another call would exceed budget.
@@ -98,7 +180,8 @@ class APIClient:
         system_prompt: str,
         user_message: str,
         max_tokens: int = 1024,
-        model: str = MODEL_NAME
+        model: str = MODEL_NAME,
+        cached_prefix: Optional[str] = None
     ) -> APIResponse:
         """
         Make an API call to Claude.
@@ -107,39 +190,139 @@ class APIClient:
             system_prompt: System message for the model
             user_message: User message (question + options)
             max_tokens: Maximum tokens in response
+            cached_prefix: Optional constant prefix (e.g. scaffolding
+                pre-prompt) sent as a second cache_control system block
+                so it hits the server-side prompt cache
             
         Returns:
             APIResponse with answer, tokens, latency, and cost
         """
-        # Check budget before call
-        self.check_budget()
-        
         if self.dry_run:
+            # Check budget before call
+            self.check_budget()
             return self._simulate_call(user_message, model)
-        
-        return self._real_call(system_prompt, user_message, max_tokens, model)
+
+        # Identical (model, system, prefix, user) tuples return the
+        # cached response without an HTTP call
+        cache_key = self._cache_key(system_prompt, user_message, model, cached_prefix)
+        if self.cache_enabled and cache_key in self._response_cache:
+            self.cache_hits += 1
+            return replace(self._response_cache[cache_key], cost_usd=0.0, latency_seconds=0.0)
+
+        cached = self._persistent_lookup(cache_key)
+        if cached is not None:
+            return cached
+
+        # Check budget before call
+        self.check_budget()
+
+        response = self._real_call(system_prompt, user_message, max_tokens, model, cached_prefix)
+        self._store_response(cache_key, response)
+        return response
+
+    @staticmethod
+    def _cache_key(
+        system_prompt: str,
+        user_message: str,
+        model: str,
+        cached_prefix: Optional[str] = None
+    ) -> str:
+        """Content-addressed key for the response cache."""
+        payload = f"{model}\x00{system_prompt}\x00{cached_prefix or ''}\x00{user_message}".encode()
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def _persistent_lookup(self, cache_key: str) -> Optional[APIResponse]:
+        """Check the on-disk response cache; hits are billed at zero."""
+        if self._persistent_cache is None:
+            return None
+        row = self._persistent_cache.get(cache_key)
+        if row is None:
+            return None
+        self.cache_hits += 1
+        logger.debug("Persistent cache hit")
+        answer_text, input_tokens, output_tokens, _latency, _cost = row
+        response = APIResponse(
+            answer_text=answer_text,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            latency_seconds=0.0,
+            cost_usd=0.0
+        )
+        if self.cache_enabled:
+            self._response_cache[cache_key] = response
+        return response
+
+    def _store_response(self, cache_key: str, response: APIResponse) -> None:
+        """Populate the in-memory and (if enabled) on-disk caches."""
+        if self.cache_enabled:
+            self._response_cache[cache_key] = response
+        if self._persistent_cache is not None:
+            self._persistent_cache.set(
+                cache_key,
+                response.answer_text,
+                response.input_tokens,
+                response.output_tokens,
+                response.latency_seconds,
+                response.cost_usd
+            )
+
+    @staticmethod
+    def _system_blocks(system_prompt: str, cached_prefix: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        Build system content blocks with prompt-cache breakpoints.
+
+        The constant system prompt and any scaffolding prefix each get a
+        cache_control marker, so only the per-question user turn is
+        billed at the full input rate after the first call.
+        """
+        blocks = [
+            {
+                "type": "text",
+                "text": system_prompt,
+                "cache_control": {"type": "ephemeral"}
+            }
+        ]
+        if cached_prefix:
+            blocks.append({
+                "type": "text",
+                "text": cached_prefix,
+                "cache_control": {"type": "ephemeral"}
+            })
+        return blocks
+
+    @staticmethod
+    def _cost_rates(model: str) -> Tuple[float, float]:
+        """Per-token input/output prices for a model."""
+        rates = PER_TOKEN_PRICING.get(model)
+        if rates is None:
+            rates = PER_TOKEN_PRICING[MODEL_NAME]
+        return rates
     
     def _simulate_call(self, user_message: str, model: str) -> APIResponse:
         """Simulate an API call for dry run mode."""
         # Simulate some delay
         time.sleep(0.1)
-        
-        # Estimate tokens (rough approximation)
-        input_tokens = len(user_message.split()) * 1.3
+        return self._simulate_response(user_message, model)
+
+    def _simulate_response(self, user_message: str, model: str) -> APIResponse:
+        """Build a simulated response (bookkeeping only, no delay)."""
+        # Estimate tokens (~4 chars per token rule of thumb, no allocation)
+        input_tokens = len(user_message) // 4
         output_tokens = 5
-        
-        cost = calculate_cost(int(input_tokens), int(output_tokens), model)
-        self.cumulative_cost += cost
-        self.total_calls += 1
-        
+
+        rate_in, rate_out = self._cost_rates(model)
+        cost = input_tokens * rate_in + output_tokens * rate_out
+        with self._cost_lock:
+            self.cumulative_cost += cost
+            self.total_calls += 1
+
         # Return random answer for simulation
-        import random
-        answer = random.choice("ABCDEFGHIJ")
-        
+        answer = _rng.choice(_LETTERS)
+
         return APIResponse(
             answer_text=answer,
-            input_tokens=int(input_tokens),
-            output_tokens=int(output_tokens),
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
             latency_seconds=0.1,
             cost_usd=cost
         )
@@ -149,7 +332,8 @@ class APIClient:
         system_prompt: str,
         user_message: str,
         max_tokens: int,
-        model: str
+        model: str,
+        cached_prefix: Optional[str] = None
     ) -> APIResponse:
         """Make actual API call with retry logic."""
         import anthropic
@@ -163,31 +347,37 @@ class APIClient:
                 response = self.client.messages.create(
                     model=model,
                     max_tokens=max_tokens,
-                    system=system_prompt,
+                    system=self._system_blocks(system_prompt, cached_prefix),
                     messages=[
                         {"role": "user", "content": user_message}
                     ]
                 )
-                
+
                 latency = time.time() - start_time
-                
+
                 # Extract text from response
                 answer_text = ""
                 if response.content and len(response.content) > 0:
                     answer_text = response.content[0].text
-                
-                # Get token usage
+
+                # Get token usage (cache fields absent on older SDK versions)
                 input_tokens = response.usage.input_tokens
                 output_tokens = response.usage.output_tokens
-                
-                # Calculate cost
-                cost = calculate_cost(input_tokens, output_tokens, model)
-                self.cumulative_cost += cost
-                self.total_calls += 1
-                
-                # Delay before next call
-                time.sleep(API_DELAY_SECONDS)
-                
+                cache_creation_tokens = getattr(response.usage, 'cache_creation_input_tokens', 0) or 0
+                cache_read_tokens = getattr(response.usage, 'cache_read_input_tokens', 0) or 0
+
+                # Calculate cost (cached prefix tokens are billed at reduced rates)
+                cost = calculate_cost(
+                    input_tokens,
+                    output_tokens,
+                    model,
+                    cache_creation_tokens=cache_creation_tokens,
+                    cache_read_tokens=cache_read_tokens
+                )
+                with self._cost_lock:
+                    self.cumulative_cost += cost
+                    self.total_calls += 1
+
                 return APIResponse(
                     answer_text=answer_text,
                     input_tokens=input_tokens,
@@ -195,7 +385,7 @@ class APIClient:
                     latency_seconds=latency,
                     cost_usd=cost
                 )
-                
+
             except anthropic.RateLimitError as e:
                 last_error = e
                 wait_time = (2 ** attempt) * 2  # Exponential backoff
@@ -218,11 +408,292 @@ class APIClient:
         
         raise last_error if last_error else Exception("Max retries exceeded")
     
+    def build_batch_request(
+        self,
+        custom_id: str,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int = 1024,
+        model: str = MODEL_NAME
+    ) -> Dict[str, Any]:
+        """Build a single request dict for the Message Batches API."""
+        return {
+            "custom_id": custom_id,
+            "params": {
+                "model": model,
+                "max_tokens": max_tokens,
+                "system": [
+                    {
+                        "type": "text",
+                        "text": system_prompt,
+                        "cache_control": {"type": "ephemeral"}
+                    }
+                ],
+                "messages": [
+                    {"role": "user", "content": user_message}
+                ]
+            }
+        }
+
+    def submit_batch(self, requests: List[Dict[str, Any]]) -> str:
+        """
+        Submit requests to the Message Batches API.
+
+        Batched requests are billed at 50% of the normal price and avoid
+        per-call round-trip latency.
+
+        Args:
+            requests: Request dicts from build_batch_request
+
+        Returns:
+            The batch ID for polling
+        """
+        self.check_budget(estimated_cost=0.01 * len(requests))
+        batch = self.client.messages.batches.create(requests=requests)
+        logger.info(f"Submitted batch {batch.id} with {len(requests)} requests")
+        return batch.id
+
+    def get_batch_status(self, batch_id: str) -> Tuple[str, int, int]:
+        """
+        Poll a batch's processing status.
+
+        Returns:
+            Tuple of (processing_status, succeeded_count, total_count)
+        """
+        batch = self.client.messages.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        total = (
+            counts.processing + counts.succeeded + counts.errored +
+            counts.canceled + counts.expired
+        )
+        return batch.processing_status, counts.succeeded, total
+
+    def iter_batch_results(self, batch_id: str) -> Iterator[Tuple[str, Optional[APIResponse]]]:
+        """
+        Stream results of a completed batch.
+
+        Yields:
+            Tuples of (custom_id, APIResponse) — APIResponse is None for
+            requests that errored or expired.
+        """
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                logger.warning(f"Batch request {entry.custom_id} ended as {entry.result.type}")
+                yield entry.custom_id, None
+                continue
+
+            message = entry.result.message
+            answer_text = ""
+            if message.content and len(message.content) > 0:
+                answer_text = message.content[0].text
+
+            input_tokens = message.usage.input_tokens
+            output_tokens = message.usage.output_tokens
+            cache_creation_tokens = getattr(message.usage, 'cache_creation_input_tokens', 0) or 0
+            cache_read_tokens = getattr(message.usage, 'cache_read_input_tokens', 0) or 0
+
+            cost = calculate_cost(
+                input_tokens,
+                output_tokens,
+                message.model,
+                cache_creation_tokens=cache_creation_tokens,
+                cache_read_tokens=cache_read_tokens
+            ) * BATCH_PRICE_MULTIPLIER
+            self.cumulative_cost += cost
+            self.total_calls += 1
+
+            yield entry.custom_id, APIResponse(
+                answer_text=answer_text,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                latency_seconds=0.0,
+                cost_usd=cost
+            )
+
     def get_stats(self) -> Tuple[float, int]:
         """Return cumulative cost and total calls."""
         return self.cumulative_cost, self.total_calls
 
 
+class AsyncAPIClient(APIClient):
+    """
+    Async variant of APIClient backed by anthropic.AsyncAnthropic.
+
+    Shares the budget/cost bookkeeping with APIClient but makes
+    non-blocking calls, so many questions can be in flight at once
+    under a semaphore.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        dry_run: bool = False,
+        cache_enabled: bool = True,
+        persistent_cache: bool = False
+    ):
+        # Initialize bookkeeping without creating the sync client
+        super().__init__(
+            api_key, dry_run=True, cache_enabled=cache_enabled,
+            persistent_cache=persistent_cache
+        )
+        self.dry_run = dry_run
+
+        if not dry_run:
+            try:
+                self.client = _get_async_client(api_key)
+            except ImportError:
+                raise ImportError(
+                    "anthropic package is required. Install with: pip install anthropic"
+                )
+
+    async def call(
+        self,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int = 1024,
+        model: str = MODEL_NAME,
+        cached_prefix: Optional[str] = None
+    ) -> APIResponse:
+        """Async counterpart of APIClient.call."""
+        if self.dry_run:
+            self.check_budget()
+            # Non-blocking delay: the sync _simulate_call's time.sleep
+            # would stall the event loop and serialize the whole fan-out
+            await asyncio.sleep(0.1)
+            return self._simulate_response(user_message, model)
+
+        cache_key = self._cache_key(system_prompt, user_message, model, cached_prefix)
+        if self.cache_enabled and cache_key in self._response_cache:
+            self.cache_hits += 1
+            return replace(self._response_cache[cache_key], cost_usd=0.0, latency_seconds=0.0)
+
+        cached = self._persistent_lookup(cache_key)
+        if cached is not None:
+            return cached
+
+        self.check_budget()
+
+        response = await self._real_call(system_prompt, user_message, max_tokens, model, cached_prefix)
+        self._store_response(cache_key, response)
+        return response
+
+    async def _real_call(
+        self,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        model: str,
+        cached_prefix: Optional[str] = None
+    ) -> APIResponse:
+        """Make actual async API call with retry logic."""
+        import anthropic
+        import asyncio
+
+        last_error = None
+
+        for attempt in range(MAX_RETRIES):
+            try:
+                start_time = time.time()
+
+                response = await self.client.messages.create(
+                    model=model,
+                    max_tokens=max_tokens,
+                    system=self._system_blocks(system_prompt, cached_prefix),
+                    messages=[
+                        {"role": "user", "content": user_message}
+                    ]
+                )
+
+                latency = time.time() - start_time
+
+                answer_text = ""
+                if response.content and len(response.content) > 0:
+                    answer_text = response.content[0].text
+
+                input_tokens = response.usage.input_tokens
+                output_tokens = response.usage.output_tokens
+                cache_creation_tokens = getattr(response.usage, 'cache_creation_input_tokens', 0) or 0
+                cache_read_tokens = getattr(response.usage, 'cache_read_input_tokens', 0) or 0
+
+                cost = calculate_cost(
+                    input_tokens,
+                    output_tokens,
+                    model,
+                    cache_creation_tokens=cache_creation_tokens,
+                    cache_read_tokens=cache_read_tokens
+                )
+                self.cumulative_cost += cost
+                self.total_calls += 1
+
+                return APIResponse(
+                    answer_text=answer_text,
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    latency_seconds=latency,
+                    cost_usd=cost
+                )
+
+            except anthropic.RateLimitError as e:
+                last_error = e
+                wait_time = (2 ** attempt) * 2  # Exponential backoff
+                logger.warning(f"Rate limited, waiting {wait_time}s (attempt {attempt + 1}/{MAX_RETRIES})")
+                await asyncio.sleep(wait_time)
+
+            except anthropic.APIStatusError as e:
+                last_error = e
+                wait_time = (2 ** attempt) * 1
+                logger.warning(f"API error: {e}, retrying in {wait_time}s (attempt {attempt + 1}/{MAX_RETRIES})")
+                await asyncio.sleep(wait_time)
+
+            except Exception as e:
+                last_error = e
+                logger.error(f"Unexpected error: {e}")
+                if attempt < MAX_RETRIES - 1:
+                    await asyncio.sleep(1)
+                else:
+                    raise
+
+        raise last_error if last_error else Exception("Max retries exceeded")
+
+
+# Valid answer letters for membership tests
+_ANSWER_SET = frozenset('ABCDEFGHIJ')
+_VALID_ANY_CASE = frozenset('ABCDEFGHIJabcdefghij')
+
+# Constant system prompt for the LLM extraction fallback, built once
+_FALLBACK_SYSTEM = (
+    "You are an answer extraction assistant. Your ONLY job is to output "
+    "a single letter A-J representing the answer choice. "
+    "Output ONLY the letter, nothing else."
+)
+
+# All extraction patterns fused into one alternation so a single
+# left-to-right scan replaces the old six-pass cascade. Alternation
+# order only settles ties at one position; matches are ranked by group
+# priority below so the cascade's precedence holds across the text.
+_FUSED_PATTERN = (
+    r'\b(?:answer|choice|option)\s*(?:is|:)\s*(?P<explicit>[A-J])\b'
+    r'|\b(?P<claimed>[A-J])\s+is\s+(?:the\s+)?(?:correct|right|best)\b'
+    r'|\b(?:correct|right|best)\s+(?:answer|choice|option)\s*(?:is|:)?\s*(?P<stated>[A-J])\b'
+    # Letter at start (excluding A and I which could be words)
+    r'|^\s*\(?(?P<start>[B-HJ])\)?[\.:\)]'
+    r'|^\s*\((?P<paren>[A-J])\)'  # Letter in parentheses at start
+    r'|\b(?P<punct>[B-HJ])[\.:\)]'
+    r'|(?<![A-Za-z])(?P<aword>A)\.(?!\w)'
+    r'|\b(?P<plain>[B-HJ])\b'
+)
+
+# Group name -> rank in the original cascade, lower wins
+_GROUP_PRIORITY = {
+    name: rank
+    for rank, name in enumerate(
+        ('explicit', 'claimed', 'stated', 'start', 'paren', 'punct', 'aword', 'plain')
+    )
+}
+
+_FUSED = re.compile(_FUSED_PATTERN, re.IGNORECASE)
+
+
 def extract_answer(response_text: str) -> Optional[str]:
     """
     Extract the answer letter (A-J) from model response.
@@ -238,13 +709,20 @@ def extract_answer(response_text: str) -> Optional[str]:
     """
     if not response_text:
         return None
-    
+
+    # Fast path: the dominant response is a bare single letter — answer
+    # it without allocating stripped/upper copies. Anything longer
+    # (even "A.") goes through the exact cascade below, which encodes
+    # the deliberate A/I-need-punctuation rules.
+    if len(response_text) == 1:
+        return response_text.upper() if response_text in _VALID_ANY_CASE else None
+
     text = response_text.strip()
     text_upper = text.upper()
     
     # Case 1: Response is just a single letter (possibly with punctuation)
     clean = text_upper.strip('.')
-    if len(clean) == 1 and clean in 'ABCDEFGHIJ':
+    if len(clean) == 1 and clean in _ANSWER_SET:
         return clean
     
     # Case 2: Response starts with a valid answer letter followed by punctuation or space
@@ -262,39 +740,35 @@ def extract_answer(response_text: str) -> Optional[str]:
             elif second_char in '.):' and first_char in 'AI':
                 return first_char
     
-    # Case 3: Look for explicit patterns like "answer is X" or "answer: X"
-    patterns = [
-        r'\b(?:answer|choice|option)\s*(?:is|:)\s*([A-J])\b',
-        r'\b([A-J])\s+is\s+(?:the\s+)?(?:correct|right|best)\b',
-        r'\b(?:correct|right|best)\s+(?:answer|choice|option)\s*(?:is|:)?\s*([A-J])\b',
-        r'^\s*\(?([B-HJ])\)?[\.:\)]',  # Letter at start (excluding A and I which could be words)
-        r'^\s*\(([A-J])\)',  # Letter in parentheses at start
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text_upper, re.IGNORECASE)
-        if match:
-            # Find the first non-None group
-            for g in match.groups():
-                if g:
-                    return g.upper()
-    
-    # Case 4: Look for letter followed by period or colon (common answer format)
-    match = re.search(r'\b([B-HJ])[\.:\)]', text_upper)
-    if match:
-        return match.group(1)
-    
-    # Case 5: For A, only match if it's clearly an answer (followed by period at word boundary)
-    match = re.search(r'(?<![A-Za-z])([A])\.(?!\w)', text_upper)
-    if match:
-        return match.group(1)
-    
-    # Case 6: Last resort - find standalone letter that's not A or I (common words)
-    match = re.search(r'\b([B-HJ])\b', text_upper)
-    if match:
-        return match.group(1)
-    
-    return None
+    # Case 3: Single fused scan covering "answer is X", letters with
+    # punctuation, parenthesized letters, and the standalone fallback.
+    # Keep the best-ranked match rather than the first one: an explicit
+    # "the correct answer is E" later in the text must beat an earlier
+    # last-resort hit like a bare "B." (cascade semantics)
+    best = None
+    best_rank = len(_GROUP_PRIORITY)
+    for match in _FUSED.finditer(text_upper):
+        rank = _GROUP_PRIORITY[match.lastgroup]
+        if rank < best_rank:
+            best = match.group(match.lastgroup)
+            best_rank = rank
+            if rank == 0:
+                break
+
+    return best.upper() if best else None
+
+
+# Shared on-disk cache for fallback extractions, created on first miss
+_extraction_cache = None
+
+
+def _get_extraction_cache():
+    """Lazily open the persistent extraction cache."""
+    global _extraction_cache
+    if _extraction_cache is None:
+        from extractor_cache import ExtractionCache
+        _extraction_cache = ExtractionCache()
+    return _extraction_cache
 
 
 def extract_answer_with_llm_fallback(
@@ -317,19 +791,20 @@ def extract_answer_with_llm_fallback(
     Returns:
         A valid letter A-J (guaranteed)
     """
-    # Try regex extraction first
+    # Try regex extraction first — nothing is allocated unless we fall through
     extracted = extract_answer(response_text)
-    if extracted and extracted in 'ABCDEFGHIJ':
+    if extracted and extracted in _ANSWER_SET:
         return extracted
-    
+
+    # Identical malformed outputs repeat across runs; check the
+    # persistent cache before paying for an extraction call
+    cache = _get_extraction_cache()
+    cached = cache.get(response_text)
+    if cached:
+        return cached
+
     # LLM fallback: Ask Haiku to extract the answer
-    fallback_system = (
-        "You are an answer extraction assistant. Your ONLY job is to output "
-        "a single letter A-J representing the answer choice. "
-        "Output ONLY the letter, nothing else."
-    )
-    
-    fallback_prompt = f"""The following is a response to a multiple choice question. 
+    fallback_prompt = f"""The following is a response to a multiple choice question.
 Extract which answer (A-J) was chosen or intended.
 
 Question: {question_text[:300]}...
@@ -341,18 +816,75 @@ Response to extract from: "{response_text}"
 Output ONLY the single letter (A-J) that best represents the answer. If unclear, make your best guess."""
 
     try:
-        fallback_response = client.call(fallback_system, fallback_prompt, max_tokens=5)
+        fallback_response = client.call(_FALLBACK_SYSTEM, fallback_prompt, max_tokens=5)
         fallback_text = fallback_response.answer_text.strip().upper()
         
         # Extract letter from fallback response
         for char in fallback_text:
-            if char in 'ABCDEFGHIJ':
+            if char in _ANSWER_SET:
+                cache.set(response_text, char)
                 return char
         
         # If still no valid letter, default to A
+        cache.set(response_text, 'A')
         return 'A'
         
     except Exception as e:
         logger.warning(f"LLM fallback extraction failed: {e}")
         # Default to A if all else fails
         return 'A'
+
+
+async def extract_answer_with_llm_fallback_async(
+    response_text: str,
+    client: 'AsyncAPIClient',
+    question_text: str = "",
+    options_text: str = ""
+) -> str:
+    """
+    Async counterpart of extract_answer_with_llm_fallback.
+
+    Guarantees a valid A-J letter is returned.
+    """
+    # Try regex extraction first — nothing is allocated unless we fall through
+    extracted = extract_answer(response_text)
+    if extracted and extracted in _ANSWER_SET:
+        return extracted
+
+    # Identical malformed outputs repeat across runs; check the
+    # persistent cache before paying for an extraction call
+    cache = _get_extraction_cache()
+    cached = cache.get(response_text)
+    if cached:
+        return cached
+
+    # LLM fallback: Ask Haiku to extract the answer
+    fallback_prompt = f"""The following is a response to a multiple choice question.
+Extract which answer (A-J) was chosen or intended.
+
+Question: {question_text[:300]}...
+
+Options: {options_text[:500]}...
+
+Response to extract from: "{response_text}"
+
+Output ONLY the single letter (A-J) that best represents the answer. If unclear, make your best guess."""
+
+    try:
+        fallback_response = await client.call(_FALLBACK_SYSTEM, fallback_prompt, max_tokens=5)
+        fallback_text = fallback_response.answer_text.strip().upper()
+
+        # Extract letter from fallback response
+        for char in fallback_text:
+            if char in _ANSWER_SET:
+                cache.set(response_text, char)
+                return char
+
+        # If still no valid letter, default to A
+        cache.set(response_text, 'A')
+        return 'A'
+
+    except Exception as e:
+        logger.warning(f"LLM fallback extraction failed: {e}")
+        # Default to A if all else fails
+        return 'A'
@@ -1,6 +1,14 @@
 import os
 import random
+from collections import defaultdict
 from typing import List, Dict, Any, Optional
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+    _np_rng = np.random.default_rng()
+except ImportError:
+    HAS_NUMPY = False
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
@@ -14,10 +22,10 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-from config import load_config, ScaffoldingConfig, MODEL_PRICING
+from config import load_config, ScaffoldingConfig, MODEL_PRICING, MAX_CONCURRENT_REQUESTS
 from data_loader import load_mmlu_pro_data
-from api_client import APIClient, extract_answer_with_llm_fallback
-from evaluator import run_single_test
+from api_client import AsyncAPIClient, extract_answer_with_llm_fallback_async, _get_async_client
+from evaluator import format_user_message, scaffold_prefix, SYSTEM_PROMPT
 
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -25,22 +33,46 @@ from pathlib import Path
 # Global variable for questions
 ALL_QUESTIONS = []
 
+# Columnar subject index (SoA): subject -> row indices into ALL_QUESTIONS,
+# built once at startup so sampling works on flat int lists instead of
+# walking 12k Question objects per request
+SUBJECT_INDEX: Dict[str, List[int]] = {}
+
+
+def build_subject_index(questions: List[Any]) -> Dict[str, List[int]]:
+    """Group question row indices by subject in one pass."""
+    index = defaultdict(list)
+    for i, q in enumerate(questions):
+        index[q.subject].append(i)
+    return dict(index)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Load data on startup (Synchronous/Blocking for reliability)
-    global ALL_QUESTIONS
+    global ALL_QUESTIONS, SUBJECT_INDEX
     try:
         # Use relative path for deployment compatibility
         DATA_DIR = Path(__file__).parent / "MMLU-Pro" / "data"
         logger.info(f"Loading data from {DATA_DIR}")
-        
+
         # Load directly (blocking) to ensure data is ready before serving
         ALL_QUESTIONS = load_mmlu_pro_data(DATA_DIR)
-        logger.info(f"Loaded {len(ALL_QUESTIONS)} questions")
+        SUBJECT_INDEX = build_subject_index(ALL_QUESTIONS)
+        logger.info(f"Loaded {len(ALL_QUESTIONS)} questions across {len(SUBJECT_INDEX)} subjects")
     except Exception as e:
         logger.error(f"Failed to load data: {e}")
         ALL_QUESTIONS = []
-    
+        SUBJECT_INDEX = {}
+
+    # Pre-warm the shared API client so TLS is established before the
+    # first request arrives
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if api_key:
+        try:
+            _get_async_client(api_key)
+        except ImportError:
+            logger.warning("anthropic package not installed, skipping client pre-warm")
+
     yield
     
     # Clean up on shutdown
@@ -75,53 +107,61 @@ class TestResult(BaseModel):
     questions_tested: int
 
 def get_stratified_sample(questions: List[Any], size: int = 14) -> List[Any]:
-    """Get a stratified sample of questions (1 per subject if possible)."""
+    """
+    Get a stratified sample of questions (1 per subject if possible).
+
+    Single pass over the corpus: questions are bucketed by subject once,
+    and the fill step reuses the buckets instead of rescanning the list.
+    The loader guarantees every item exposes .subject and .question_id.
+    """
     if not questions:
         return []
-        
-    subjects = {}
-    for q in questions:
-        # Handle both dict and Question object
-        if isinstance(q, dict):
-            subj = q.get('category', 'unknown')
-        else:
-            subj = q.subject
-            
-        if subj not in subjects:
-            subjects[subj] = []
-        subjects[subj].append(q)
-    
-    sample = []
-    # Take one from each subject first
-    for subj in sorted(subjects.keys()):
-        if subjects[subj]:
-            sample.append(random.choice(subjects[subj]))
-    
+
+    # Reuse the startup-built columnar index for the full corpus;
+    # only ad-hoc question lists pay for a fresh grouping pass
+    if questions is ALL_QUESTIONS and SUBJECT_INDEX:
+        buckets = SUBJECT_INDEX
+    else:
+        buckets = build_subject_index(questions)
+
+    # Take one row index from each subject first — one vectorized draw
+    # across all subjects when numpy is available
+    subjects_sorted = sorted(buckets)
+    if HAS_NUMPY:
+        lengths = np.array([len(buckets[subj]) for subj in subjects_sorted])
+        offsets = _np_rng.integers(0, lengths)
+        picks = [buckets[subj][off] for subj, off in zip(subjects_sorted, offsets)]
+    else:
+        picks = [random.choice(buckets[subj]) for subj in subjects_sorted]
+
     # Fill remaining if needed (or trim if too many subjects)
-    if len(sample) > size:
-        sample = random.sample(sample, size)
-    elif len(sample) < size:
-        remaining_needed = size - len(sample)
-        # Flatten all remaining questions
-        all_remaining = []
-        
-        # Get IDs for exclusion
-        sample_ids = set()
-        for q in sample:
-            if isinstance(q, dict):
-                sample_ids.add(q.get('question_id'))
-            else:
-                sample_ids.add(q.question_id)
-                
-        for q in questions:
-            q_id = q.get('question_id') if isinstance(q, dict) else q.question_id
-            if q_id not in sample_ids:
-                all_remaining.append(q)
-        
+    if len(picks) > size:
+        picks = random.sample(picks, size)
+    elif len(picks) < size:
+        remaining_needed = size - len(picks)
+        picked = set(picks)
+        all_remaining = [
+            i for bucket in buckets.values() for i in bucket
+            if i not in picked
+        ]
+
         if all_remaining:
-            sample.extend(random.sample(all_remaining, min(len(all_remaining), remaining_needed)))
-            
-    return sample
+            picks.extend(random.sample(all_remaining, min(len(all_remaining), remaining_needed)))
+
+    return [questions[i] for i in picks]
+
+# Cached stratified sample, shared by repeat /api/run-test calls so
+# re-runs hit the same questions (and the response cache)
+_SAMPLE_CACHE: Optional[List[Any]] = None
+
+
+def get_cached_sample(size: int = 14) -> List[Any]:
+    """Return the stratified sample, computing it once per process."""
+    global _SAMPLE_CACHE
+    if _SAMPLE_CACHE is None:
+        _SAMPLE_CACHE = get_stratified_sample(ALL_QUESTIONS, size=size)
+    return _SAMPLE_CACHE
+
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -130,7 +170,7 @@ async def read_root():
     return FileResponse("static/index.html")
 
 from fastapi.responses import StreamingResponse
-import json
+import orjson
 import asyncio
 
 @app.post("/api/run-test")
@@ -139,86 +179,79 @@ async def run_test(request: TestRequest):
     if not api_key:
         raise HTTPException(status_code=500, detail="ANTHROPIC_API_KEY not set")
     
-    client = APIClient(api_key=api_key)
-    
-    # Get stratified sample
-    questions = get_stratified_sample(ALL_QUESTIONS, size=14)
+    client = AsyncAPIClient(api_key=api_key)
+
+    # Get stratified sample (cached across requests)
+    questions = get_cached_sample(size=14)
     total_steps = len(questions) * 2  # Baseline + Scaffolded
-    
+
     async def event_generator():
-        # Run Baseline (No scaffolding)
+        # Optimization: If pre-prompt is empty, scaffolded == baseline
+        is_empty_scaffolding = not request.pre_prompt or not request.pre_prompt.strip()
+        if is_empty_scaffolding:
+            logger.info("Empty scaffolding detected. Reusing baseline results.")
+
+        scaffolded_config = ScaffoldingConfig(enabled=True, pre_prompt=request.pre_prompt)
+
+        # Fan out all calls concurrently, bounded by a semaphore so we
+        # stay under the API's concurrency limit
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        async def run_one(q, variant: str):
+            include = variant == "scaffolded"
+            user_message = format_user_message(q)
+            async with semaphore:
+                response = await client.call(
+                    SYSTEM_PROMPT, user_message, model=request.model,
+                    cached_prefix=scaffold_prefix(scaffolded_config, include)
+                )
+            answer = await extract_answer_with_llm_fallback_async(
+                response.answer_text, client, q.question_text, q.format_options()
+            )
+            return q, variant, answer, response
+
+        tasks = [
+            asyncio.create_task(run_one(q, "baseline")) for q in questions
+        ]
+        if not is_empty_scaffolding:
+            tasks += [
+                asyncio.create_task(run_one(q, "scaffolded")) for q in questions
+            ]
+
         baseline_correct = 0
         baseline_cost = 0.0
-        baseline_config = ScaffoldingConfig(enabled=False, pre_prompt="")
-        
+        scaffolded_correct = 0
+        scaffolded_cost = 0.0
         completed_steps = 0
-        
-        for i, q in enumerate(questions):
-            # Yield progress
-            yield json.dumps({
+
+        # Stream progress as each call completes rather than after the fact
+        for future in asyncio.as_completed(tasks):
+            q, variant, answer, response = await future
+
+            # parse_question normalized every row into a Question upstream,
+            # so no dict-vs-attribute dispatch is needed per result
+            is_correct = answer == q.correct_answer
+
+            if variant == "baseline":
+                baseline_cost += response.cost_usd
+                if is_correct:
+                    baseline_correct += 1
+            else:
+                scaffolded_cost += response.cost_usd
+                if is_correct:
+                    scaffolded_correct += 1
+
+            completed_steps += 2 if is_empty_scaffolding else 1
+            yield orjson.dumps({
                 "type": "progress",
                 "completed": completed_steps,
                 "total": total_steps,
-                "message": f"Running Baseline: Question {i+1}/{len(questions)}"
-            }) + "\n"
-            
-            # Small delay to ensure UI updates smoothly
-            await asyncio.sleep(0.01)
-            
-            answer, response = run_single_test(client, q, baseline_config, include_scaffolding=False, model=request.model)
-            baseline_cost += response.cost_usd
-            
-            correct_answer = q.correct_answer if not isinstance(q, dict) else q.get('answer')
-            if answer == correct_answer:
-                baseline_correct += 1
-            
-            completed_steps += 1
-            
-        # Run Scaffolded
-        scaffolded_correct = 0
-        scaffolded_cost = 0.0
-        
-        # Optimization: If pre-prompt is empty, reuse baseline results
-        is_empty_scaffolding = not request.pre_prompt or not request.pre_prompt.strip()
-        
+                "message": f"Completed {variant} call ({completed_steps}/{total_steps})"
+            }) + b"\n"
+
         if is_empty_scaffolding:
-            logger.info("Empty scaffolding detected. Reusing baseline results.")
             scaffolded_correct = baseline_correct
             scaffolded_cost = baseline_cost
-            
-            # Simulate progress for the second half
-            for i in range(len(questions)):
-                completed_steps += 1
-                yield json.dumps({
-                    "type": "progress",
-                    "completed": completed_steps,
-                    "total": total_steps,
-                    "message": f"Skipping redundant test {i+1}/{len(questions)}"
-                }) + "\n"
-                await asyncio.sleep(0.05) # Fast forward
-                
-        else:
-            scaffolded_config = ScaffoldingConfig(enabled=True, pre_prompt=request.pre_prompt)
-            
-            for i, q in enumerate(questions):
-                # Yield progress
-                yield json.dumps({
-                    "type": "progress",
-                    "completed": completed_steps,
-                    "total": total_steps,
-                    "message": f"Running Scaffolded: Question {i+1}/{len(questions)}"
-                }) + "\n"
-                
-                await asyncio.sleep(0.01)
-                
-                answer, response = run_single_test(client, q, scaffolded_config, include_scaffolding=True, model=request.model)
-                scaffolded_cost += response.cost_usd
-                
-                correct_answer = q.correct_answer if not isinstance(q, dict) else q.get('answer')
-                if answer == correct_answer:
-                    scaffolded_correct += 1
-                
-                completed_steps += 1
 
         # Final Result
         result_data = {
@@ -241,10 +274,10 @@ async def run_test(request: TestRequest):
             "questions_tested": len(questions)
         }
         
-        yield json.dumps({
+        yield orjson.dumps({
             "type": "result",
             "data": result_data
-        }) + "\n"
+        }) + b"\n"
 
     return StreamingResponse(event_generator(), media_type="application/x-ndjson")
 
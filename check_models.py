@@ -1,8 +1,9 @@
 import os
+import asyncio
 import anthropic
 
 api_key = os.environ.get("ANTHROPIC_API_KEY")
-client = anthropic.Anthropic(api_key=api_key)
+client = anthropic.AsyncAnthropic(api_key=api_key)
 
 candidates = [
     "claude-sonnet-4-5",          # From search result
@@ -11,18 +12,28 @@ candidates = [
     "claude-haiku-4-5-20251001"   # Known working baseline
 ]
 
-print("Testing model IDs...")
 
-for model in candidates:
-    print(f"Testing {model}...", end=" ")
+async def probe(model):
     try:
-        client.messages.create(
+        await client.messages.create(
             model=model,
             max_tokens=10,
             messages=[{"role": "user", "content": "Hi"}]
         )
-        print("SUCCESS! ✅")
+        return model, "SUCCESS! ✅"
     except anthropic.NotFoundError:
-        print("Not Found ❌")
+        return model, "Not Found ❌"
     except Exception as e:
-        print(f"Error: {e}")
+        return model, f"Error: {e}"
+
+
+async def main():
+    print("Testing model IDs...")
+    # Probe all candidates concurrently; print in original order
+    results = await asyncio.gather(*(probe(m) for m in candidates))
+    for model, status in results:
+        print(f"Testing {model}... {status}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -56,22 +56,31 @@ def check_dataset():
         print("   Run: python3 download_dataset.py")
         return False
     
-    # Check for data files
-    parquet_files = list(data_dir.glob("*.parquet"))
-    json_files = list(data_dir.glob("*.json*"))
-    
+    # Check for data files with one scandir pass; DirEntry.stat() is
+    # cached so no extra stat syscall per file
+    parquet_files = []
+    json_files = []
+    with os.scandir(data_dir) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            if entry.name.endswith('.parquet'):
+                parquet_files.append((entry.name, entry.stat().st_size))
+            elif '.json' in entry.name:
+                json_files.append((entry.name, entry.stat().st_size))
+
     if not parquet_files and not json_files:
         print(f"❌ No data files found in {data_dir}")
         print("   Run: python3 download_dataset.py")
         return False
-    
+
     total_files = len(parquet_files) + len(json_files)
     print(f"✅ Dataset found ({total_files} files in {data_dir})")
-    
-    for f in parquet_files[:3]:  # Show first 3
-        size_mb = f.stat().st_size / (1024 * 1024)
-        print(f"   - {f.name} ({size_mb:.1f} MB)")
-    
+
+    for name, size in sorted(parquet_files)[:3]:  # Show first 3
+        size_mb = size / (1024 * 1024)
+        print(f"   - {name} ({size_mb:.1f} MB)")
+
     return True
 
 
@@ -5,16 +5,34 @@ Saves progress after each question to allow resuming interrupted runs.
 """
 
 import json
+import os
+import queue
+import threading
 from pathlib import Path
-from typing import Set, List, Dict, Any
-from dataclasses import dataclass, asdict
+from typing import Set, List, Dict, Any, Optional
+from dataclasses import dataclass
 import logging
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+if HAS_ORJSON:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+    _loads = json.loads
+
+
+@dataclass(slots=True)
 class TestResult:
     """Result of a single test (one API call)."""
     question_id: str
@@ -28,8 +46,23 @@ class TestResult:
     latency_sec: float
     cost_usd: float
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat dict for JSON serialization (all fields are primitives)."""
+        return {
+            'question_id': self.question_id,
+            'subject': self.subject,
+            'condition': self.condition,
+            'correct_answer': self.correct_answer,
+            'model_answer': self.model_answer,
+            'is_correct': self.is_correct,
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'latency_sec': self.latency_sec,
+            'cost_usd': self.cost_usd
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class QuestionCheckpoint:
     """Checkpoint for a completed question (both conditions)."""
     question_id: str
@@ -44,17 +77,95 @@ class CheckpointManager:
     Uses JSONL format for append-friendly storage.
     """
     
-    def __init__(self, checkpoint_path: Path):
+    def __init__(self, checkpoint_path: Path, flush_every: int = 8):
         """
         Initialize checkpoint manager.
-        
+
         Args:
             checkpoint_path: Path to the checkpoint JSONL file
+            flush_every: Flush + fsync the append buffer after this many
+                saved questions (1 = durable after every question)
         """
         self.checkpoint_path = checkpoint_path
+        self.flush_every = max(1, flush_every)
+        self._fh = None  # Long-lived buffered append handle, opened lazily
+        self._unflushed = 0
         self._completed_ids: Set[str] = set()
         self._results: List[TestResult] = []
+        self._cumulative_cost = 0.0
         self._load_existing()
+        # Serialization and disk writes happen on a daemon thread so
+        # save_question returns as soon as in-memory state is updated
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_error: Optional[Exception] = None
+        self._start_writer()
+
+    def _start_writer(self) -> None:
+        """Start the background writer thread."""
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="checkpoint-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _writer_loop(self) -> None:
+        """
+        Drain the save queue: serialize records and append them to disk.
+
+        Queue items are record dicts, threading.Event flush barriers
+        (fsync then signal), or None to shut down. A write failure
+        (disk full, closed handle, bad record) is recorded so the next
+        save_question()/flush() raises instead of queueing into a dead
+        thread.
+        """
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    self._sync()
+                    return
+                if isinstance(item, threading.Event):
+                    self._sync()
+                    item.set()
+                    continue
+
+                if self._fh is None:
+                    self._fh = open(self.checkpoint_path, 'ab', buffering=1 << 20)
+                self._fh.write(_dumps(item) + b'\n')
+                self._unflushed += 1
+                if self._unflushed >= self.flush_every:
+                    self._sync()
+            except Exception as e:
+                self._writer_error = e
+                logger.error(f"Checkpoint writer failed, checkpoint data may be lost: {e}")
+                if isinstance(item, threading.Event):
+                    item.set()
+                self._drain_barriers()
+                return
+
+    def _drain_barriers(self) -> None:
+        """Wake any flush() waiters left behind by a dying writer."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def _check_writer(self) -> None:
+        """Raise if the background writer died with an error."""
+        if self._writer_error is not None:
+            raise RuntimeError(
+                f"Checkpoint writer thread failed: {self._writer_error}"
+            ) from self._writer_error
+
+    def _sync(self) -> None:
+        """Flush + fsync the append buffer (writer thread only)."""
+        if self._fh is not None and self._unflushed:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._unflushed = 0
     
     def _load_existing(self) -> None:
         """Load existing checkpoint data if file exists."""
@@ -63,27 +174,27 @@ class CheckpointManager:
             return
         
         try:
-            with open(self.checkpoint_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    data = json.loads(line)
-                    question_id = data.get('question_id')
-                    
-                    if question_id:
-                        self._completed_ids.add(question_id)
-                        
-                        # Reconstruct results
-                        if 'baseline_result' in data:
-                            self._results.append(
-                                TestResult(**data['baseline_result'])
-                            )
-                        if 'scaffolded_result' in data:
-                            self._results.append(
-                                TestResult(**data['scaffolded_result'])
-                            )
+            # One bulk read instead of buffered line-by-line text decoding
+            raw = self.checkpoint_path.read_bytes()
+            for line in raw.splitlines():
+                if not line:
+                    continue
+
+                data = _loads(line)
+                question_id = data.get('question_id')
+
+                if question_id:
+                    self._completed_ids.add(question_id)
+
+                    # Reconstruct results
+                    if 'baseline_result' in data:
+                        result = TestResult(**data['baseline_result'])
+                        self._results.append(result)
+                        self._cumulative_cost += result.cost_usd
+                    if 'scaffolded_result' in data:
+                        result = TestResult(**data['scaffolded_result'])
+                        self._results.append(result)
+                        self._cumulative_cost += result.cost_usd
             
             logger.info(
                 f"Loaded checkpoint: {len(self._completed_ids)} questions completed, "
@@ -95,18 +206,29 @@ class CheckpointManager:
             logger.info("Starting fresh due to checkpoint load error")
             self._completed_ids = set()
             self._results = []
+            self._cumulative_cost = 0.0
     
     def is_completed(self, question_id: str) -> bool:
         """Check if a question has already been completed."""
         return question_id in self._completed_ids
     
     def get_completed_ids(self) -> Set[str]:
-        """Get set of completed question IDs."""
-        return self._completed_ids.copy()
-    
+        """
+        Get set of completed question IDs.
+
+        Returns the live set (no defensive copy); callers must treat it
+        as read-only. Prefer is_completed() for membership checks.
+        """
+        return self._completed_ids
+
     def get_all_results(self) -> List[TestResult]:
-        """Get all results from checkpoint."""
-        return self._results.copy()
+        """
+        Get all results from checkpoint.
+
+        Returns the live list (no defensive copy); callers must treat it
+        as read-only.
+        """
+        return self._results
     
     def save_question(
         self,
@@ -116,46 +238,77 @@ class CheckpointManager:
     ) -> None:
         """
         Save results for a completed question.
-        
-        Appends to JSONL file for atomic writes.
+
+        Updates in-memory state (what resumability within this process
+        needs) and hands the record to the background writer, so the API
+        loop never blocks on serialization or disk. Durability follows
+        every flush_every questions and on flush()/close().
         """
-        checkpoint = QuestionCheckpoint(
-            question_id=question_id,
-            baseline_result=baseline_result,
-            scaffolded_result=scaffolded_result
-        )
-        
-        # Convert to dict for JSON serialization
+        self._check_writer()
+
+        # Convert to dict for JSON serialization (direct field access,
+        # no reflection-based deep copy)
         data = {
-            'question_id': checkpoint.question_id,
-            'baseline_result': asdict(checkpoint.baseline_result),
-            'scaffolded_result': asdict(checkpoint.scaffolded_result)
+            'question_id': question_id,
+            'baseline_result': baseline_result.to_dict(),
+            'scaffolded_result': scaffolded_result.to_dict()
         }
-        
-        # Append to file
-        with open(self.checkpoint_path, 'a') as f:
-            f.write(json.dumps(data) + '\n')
-        
+        self._queue.put(data)
+
         # Update in-memory state
         self._completed_ids.add(question_id)
         self._results.append(baseline_result)
         self._results.append(scaffolded_result)
-        
+        self._cumulative_cost += baseline_result.cost_usd + scaffolded_result.cost_usd
+
         logger.debug(f"Saved checkpoint for question {question_id}")
+
+    def flush(self) -> None:
+        """Drain queued records and force them to disk."""
+        self._check_writer()
+        if self._writer is None or not self._writer.is_alive():
+            return
+        barrier = threading.Event()
+        self._queue.put(barrier)
+        # The barrier also fires when the writer dies mid-drain; the
+        # timeout covers a barrier enqueued just as the writer exits
+        while not barrier.wait(timeout=1.0):
+            self._check_writer()
+        self._check_writer()
+
+    def close(self) -> None:
+        """Drain the queue, stop the writer, and close the handle."""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._writer = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
     
     def get_cumulative_cost(self) -> float:
-        """Calculate total cost from all results."""
-        return sum(r.cost_usd for r in self._results)
+        """Total cost across all results (maintained incrementally)."""
+        return self._cumulative_cost
     
     def clear(self) -> None:
         """Clear checkpoint file and in-memory state."""
+        self.close()
+        self._unflushed = 0
         if self.checkpoint_path.exists():
             self.checkpoint_path.unlink()
         self._completed_ids = set()
         self._results = []
+        self._cumulative_cost = 0.0
+        self._writer_error = None
+        self._start_writer()
         logger.info("Checkpoint cleared")
 
 
+# Valid answer letters; membership test avoids any string allocation on
+# the hot comparison path in create_test_result
+_LETTER_SET = frozenset('ABCDEFGHIJ')
+
+
 def create_test_result(
     question_id: str,
     subject: str,
@@ -172,11 +325,16 @@ def create_test_result(
     
     Automatically calculates is_correct based on answers.
     """
-    # Normalize answers for comparison
-    correct_norm = correct_answer.upper().strip() if correct_answer else ""
-    model_norm = model_answer.upper().strip() if model_answer else ""
-    
-    is_correct = correct_norm == model_norm and model_norm != ""
+    # Fast path: both answers are already clean single letters A-J
+    # (loader and extractor both guarantee this), so compare directly
+    # without allocating normalized copies
+    if correct_answer in _LETTER_SET and model_answer in _LETTER_SET:
+        is_correct = correct_answer == model_answer
+    else:
+        # Slow path for anything unusual: normalize as before
+        correct_norm = correct_answer.upper().strip() if correct_answer else ""
+        model_norm = model_answer.upper().strip() if model_answer else ""
+        is_correct = correct_norm == model_norm and model_norm != ""
     
     return TestResult(
         question_id=question_id,
@@ -4,6 +4,7 @@ Configuration module for MMLU-Pro A/B Testing Harness.
 Loads environment variables, scaffolding config, and defines constants.
 """
 
+import functools
 import os
 import json
 from pathlib import Path
@@ -30,16 +31,17 @@ RANDOM_SEED = 42
 # Rate limiting
 API_DELAY_SECONDS = 1.0
 MAX_RETRIES = 3
+MAX_CONCURRENT_REQUESTS = 8  # Matches Anthropic tier-1 concurrency
 
 
-@dataclass
+@dataclass(slots=True)
 class ScaffoldingConfig:
     """Configuration for the scaffolding pre-prompt."""
     enabled: bool
     pre_prompt: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Config:
     """Main configuration object."""
     api_key: str
@@ -59,8 +61,26 @@ def load_api_key() -> str:
     return api_key
 
 
+@functools.lru_cache(maxsize=None)
+def _parse_scaffolding_config(resolved_path: str) -> ScaffoldingConfig:
+    """Parse the scaffolding JSON once per resolved path (memoized)."""
+    with open(resolved_path, "r") as f:
+        data = json.load(f)
+
+    return ScaffoldingConfig(
+        enabled=data.get("enabled", True),
+        pre_prompt=data.get("pre_prompt", "")
+    )
+
+
 def load_scaffolding_config(config_path: Optional[Path] = None) -> ScaffoldingConfig:
-    """Load scaffolding configuration from JSON file."""
+    """
+    Load scaffolding configuration from JSON file.
+
+    The parsed result is cached per resolved path, so repeat load_config
+    calls skip the open/parse; callers must treat the returned object as
+    read-only.
+    """
     if config_path is None:
         config_path = Path(__file__).parent / "scaffolding_config.json"
     
@@ -70,13 +90,8 @@ def load_scaffolding_config(config_path: Optional[Path] = None) -> ScaffoldingCo
             "Please create it with 'enabled' and 'pre_prompt' fields."
         )
     
-    with open(config_path, "r") as f:
-        data = json.load(f)
-    
-    return ScaffoldingConfig(
-        enabled=data.get("enabled", True),
-        pre_prompt=data.get("pre_prompt", "")
-    )
+    # Key the cache on the resolved path so symlinked aliases share one entry
+    return _parse_scaffolding_config(str(config_path.resolve()))
 
 
 def load_config(sample_size: int = DEFAULT_SAMPLE_SIZE, dry_run: bool = False) -> Config:
@@ -89,11 +104,42 @@ def load_config(sample_size: int = DEFAULT_SAMPLE_SIZE, dry_run: bool = False) -
     )
 
 
-def calculate_cost(input_tokens: int, output_tokens: int, model_name: str = MODEL_NAME) -> float:
-    """Calculate cost in USD for given token counts and model."""
-    pricing = MODEL_PRICING.get(model_name, MODEL_PRICING[MODEL_NAME])
-    input_price, output_price = pricing
-    
-    input_cost = (input_tokens / 1_000_000) * input_price
-    output_cost = (output_tokens / 1_000_000) * output_price
-    return input_cost + output_cost
+# Prompt cache pricing multipliers (relative to normal input price)
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+# Message Batches API discount (50% off both input and output)
+BATCH_PRICE_MULTIPLIER = 0.5
+
+# Per-token rates baked at import so calculate_cost does one lookup and
+# a few multiplies instead of per-call divisions by 1e6
+PER_TOKEN_PRICING = {
+    model: (input_price * 1e-6, output_price * 1e-6)
+    for model, (input_price, output_price) in MODEL_PRICING.items()
+}
+
+
+def calculate_cost(
+    input_tokens: int,
+    output_tokens: int,
+    model_name: str = MODEL_NAME,
+    cache_creation_tokens: int = 0,
+    cache_read_tokens: int = 0
+) -> float:
+    """
+    Calculate cost in USD for given token counts and model.
+
+    Cache creation tokens are billed at 1.25x the input price and
+    cache read tokens at 0.1x, per Anthropic prompt caching pricing.
+    """
+    rates = PER_TOKEN_PRICING.get(model_name)
+    if rates is None:
+        rates = PER_TOKEN_PRICING[MODEL_NAME]
+    input_rate, output_rate = rates
+
+    return (
+        input_tokens * input_rate
+        + output_tokens * output_rate
+        + cache_creation_tokens * input_rate * CACHE_WRITE_MULTIPLIER
+        + cache_read_tokens * input_rate * CACHE_READ_MULTIPLIER
+    )
@@ -4,15 +4,31 @@ Evaluator module for running A/B tests.
 Handles prompt formatting, test execution, and result aggregation.
 """
 
+import asyncio
 import csv
 import logging
+import re
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 
-from config import ScaffoldingConfig, MODEL_NAME
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from config import ScaffoldingConfig, MODEL_NAME, RANDOM_SEED
 from data_loader import Question
-from api_client import APIClient, APIResponse, extract_answer, extract_answer_with_llm_fallback, BudgetExceededError
+from api_client import (
+    APIClient,
+    AsyncAPIClient,
+    APIResponse,
+    extract_answer,
+    extract_answer_with_llm_fallback,
+    extract_answer_with_llm_fallback_async,
+    BudgetExceededError
+)
 from checkpoint import CheckpointManager, TestResult, create_test_result
 
 
@@ -36,38 +52,31 @@ class AggregatedMetrics:
     accuracy_pct: float
     total_cost_usd: float
     cost_per_correct_usd: float
+    # 95% bootstrap interval on accuracy_pct; None when numpy is absent
+    accuracy_ci_low: Optional[float] = None
+    accuracy_ci_high: Optional[float] = None
 
 
-def format_user_message(
-    question: Question,
-    scaffolding: Optional[ScaffoldingConfig] = None,
-    include_scaffolding: bool = False
-) -> str:
+def format_user_message(question: Question) -> str:
     """
-    Format the user message for an API call.
-    
-    Args:
-        question: The question to format
-        scaffolding: Scaffolding configuration
-        include_scaffolding: Whether to include the pre-prompt
-        
-    Returns:
-        Formatted user message
+    Format the per-question tail (question + options) of an API call.
+
+    The scaffolding pre-prompt is no longer concatenated here — it rides
+    in a cached system block via APIClient.call's cached_prefix, so the
+    server-side prompt cache covers everything but this tail.
     """
-    parts = []
-    
-    # Add scaffolding if enabled
+    return f"{question.question_text}\n\n{question.format_options()}"
+
+
+def scaffold_prefix(
+    scaffolding: Optional[ScaffoldingConfig],
+    include_scaffolding: bool
+) -> Optional[str]:
+    """The cacheable scaffolding prefix for a call, or None."""
     if include_scaffolding and scaffolding and scaffolding.enabled:
         if scaffolding.pre_prompt.strip():
-            parts.append(scaffolding.pre_prompt)
-            parts.append("")  # Blank line
-    
-    # Add question and options
-    parts.append(question.question_text)
-    parts.append("")  # Blank line
-    parts.append(question.format_options())
-    
-    return "\n".join(parts)
+            return scaffolding.pre_prompt
+    return None
 
 
 def run_single_test(
@@ -89,10 +98,13 @@ def run_single_test(
     Returns:
         Tuple of (extracted_answer, api_response)
     """
-    user_message = format_user_message(question, scaffolding, include_scaffolding)
+    user_message = format_user_message(question)
     
     try:
-        response = client.call(SYSTEM_PROMPT, user_message, model=model)
+        response = client.call(
+            SYSTEM_PROMPT, user_message, model=model,
+            cached_prefix=scaffold_prefix(scaffolding, include_scaffolding)
+        )
         # Use LLM fallback to guarantee valid A-J answer
         extracted = extract_answer_with_llm_fallback(
             response.answer_text,
@@ -109,6 +121,102 @@ def run_single_test(
         raise
 
 
+async def run_single_test_async(
+    client: AsyncAPIClient,
+    question: Question,
+    scaffolding: ScaffoldingConfig,
+    include_scaffolding: bool,
+    model: str = MODEL_NAME,
+    semaphore: Optional[asyncio.Semaphore] = None
+) -> Tuple[str, APIResponse]:
+    """
+    Async counterpart of run_single_test (one non-blocking API call).
+
+    When a semaphore is given it is held around the individual API
+    call, so the concurrency limit counts in-flight requests rather
+    than question pairs (same pattern as app.py's fan-out).
+    """
+    user_message = format_user_message(question)
+
+    try:
+        if semaphore is None:
+            response = await client.call(
+                SYSTEM_PROMPT, user_message, model=model,
+                cached_prefix=scaffold_prefix(scaffolding, include_scaffolding)
+            )
+        else:
+            async with semaphore:
+                response = await client.call(
+                    SYSTEM_PROMPT, user_message, model=model,
+                    cached_prefix=scaffold_prefix(scaffolding, include_scaffolding)
+                )
+        # Use LLM fallback to guarantee valid A-J answer
+        extracted = await extract_answer_with_llm_fallback_async(
+            response.answer_text,
+            client,
+            question.question_text,
+            question.format_options()
+        )
+        return extracted, response
+
+    except BudgetExceededError:
+        raise
+    except Exception as e:
+        logger.error(f"Error testing question {question.question_id}: {e}")
+        raise
+
+
+def _build_result(
+    question: Question,
+    condition: str,
+    answer: str,
+    response: APIResponse
+) -> TestResult:
+    """Assemble a TestResult from an extracted answer and its response."""
+    return create_test_result(
+        question_id=question.question_id,
+        subject=question.subject,
+        condition=condition,
+        correct_answer=question.correct_answer,
+        model_answer=answer,
+        input_tokens=response.input_tokens,
+        output_tokens=response.output_tokens,
+        latency_sec=response.latency_seconds,
+        cost_usd=response.cost_usd
+    )
+
+
+async def run_question_ab_test_async(
+    client: AsyncAPIClient,
+    question: Question,
+    scaffolding: ScaffoldingConfig,
+    semaphore: Optional[asyncio.Semaphore] = None
+) -> Tuple[TestResult, TestResult]:
+    """
+    Run baseline and scaffolded tests for a question concurrently.
+
+    Both calls are network-bound, so gathering them roughly halves
+    per-question wall time on top of cross-question concurrency. The
+    optional semaphore bounds the individual calls.
+    """
+    (baseline_answer, baseline_response), (scaffolded_answer, scaffolded_response) = (
+        await asyncio.gather(
+            run_single_test_async(
+                client, question, scaffolding, include_scaffolding=False,
+                semaphore=semaphore
+            ),
+            run_single_test_async(
+                client, question, scaffolding, include_scaffolding=True,
+                semaphore=semaphore
+            ),
+        )
+    )
+
+    baseline_result = _build_result(question, "baseline", baseline_answer, baseline_response)
+    scaffolded_result = _build_result(question, "scaffolded", scaffolded_answer, scaffolded_response)
+    return baseline_result, scaffolded_result
+
+
 def run_question_ab_test(
     client: APIClient,
     question: Question,
@@ -162,12 +270,168 @@ def run_question_ab_test(
     return baseline_result, scaffolded_result
 
 
+# Parses one answer letter per line from a batched response
+_BATCH_ANSWER_RE = re.compile(r'^\s*(?:\d+[.):]?\s*)?([A-J])\b', re.MULTILINE)
+
+
+def format_batched_user_message(
+    questions: List[Question],
+    scaffolding: Optional[ScaffoldingConfig] = None,
+    include_scaffolding: bool = False
+) -> str:
+    """
+    Format several questions into one prompt (request fusion).
+
+    Packing K questions per call amortizes the fixed per-request
+    overhead and halves round-trips versus one call per question.
+    """
+    parts = []
+
+    if include_scaffolding and scaffolding and scaffolding.enabled:
+        if scaffolding.pre_prompt.strip():
+            parts.append(scaffolding.pre_prompt)
+            parts.append("")
+
+    for i, question in enumerate(questions, 1):
+        parts.append(f"Question {i}: {question.question_text}")
+        parts.append(question.format_options())
+        parts.append("")
+
+    parts.append(
+        f"Respond with exactly {len(questions)} letters, one per line in "
+        "question order, no explanation."
+    )
+    return "\n".join(parts)
+
+
+def run_batched_test(
+    client: APIClient,
+    questions: List[Question],
+    scaffolding: ScaffoldingConfig,
+    include_scaffolding: bool,
+    batch_size: int = 10,
+    model: str = MODEL_NAME
+) -> List[TestResult]:
+    """
+    Test questions in fused chunks of batch_size per API call.
+
+    Each chunk is one round-trip; per-question tokens and cost are the
+    chunk totals split evenly. Chunks whose responses do not parse into
+    exactly one letter per question fall back to the per-question path,
+    so results are never silently misaligned.
+    """
+    condition = "scaffolded" if include_scaffolding else "baseline"
+    results = []
+
+    for start in range(0, len(questions), batch_size):
+        chunk = questions[start:start + batch_size]
+        user_message = format_batched_user_message(chunk, scaffolding, include_scaffolding)
+        response = client.call(SYSTEM_PROMPT, user_message, model=model)
+
+        answers = _BATCH_ANSWER_RE.findall(response.answer_text.upper())
+        if len(answers) != len(chunk):
+            logger.warning(
+                f"Batched response parsed {len(answers)} answers for "
+                f"{len(chunk)} questions; falling back to per-question calls"
+            )
+            for question in chunk:
+                answer, single_response = run_single_test(
+                    client, question, scaffolding, include_scaffolding, model=model
+                )
+                results.append(_build_result(question, condition, answer, single_response))
+            continue
+
+        # Attribute the chunk's tokens and cost evenly across questions
+        n = len(chunk)
+        per_input = response.input_tokens // n
+        per_output = response.output_tokens // n
+        per_cost = response.cost_usd / n
+
+        for question, answer in zip(chunk, answers):
+            results.append(create_test_result(
+                question_id=question.question_id,
+                subject=question.subject,
+                condition=condition,
+                correct_answer=question.correct_answer,
+                model_answer=answer,
+                input_tokens=per_input,
+                output_tokens=per_output,
+                latency_sec=response.latency_seconds,
+                cost_usd=per_cost
+            ))
+
+    return results
+
+
+# Bootstrap resamples for the accuracy confidence interval
+_N_BOOT = 2000
+
+
+def _bootstrap_accuracy_ci(correct: int, total: int) -> Tuple[float, float]:
+    """
+    95% bootstrap CI on accuracy, as percentages.
+
+    For a binary outcome, each bootstrap resample mean is exactly
+    Binomial(total, correct/total) / total, so the resamples are drawn
+    in one vectorized binomial call instead of materializing
+    _N_BOOT x total index arrays.
+    """
+    rng = np.random.default_rng(RANDOM_SEED)
+    means = rng.binomial(total, correct / total, size=_N_BOOT) / total
+    low, high = np.percentile(means, [2.5, 97.5])
+    return float(low) * 100, float(high) * 100
+
+
+def _make_metrics(condition: str, total: int, correct: int, total_cost: float) -> AggregatedMetrics:
+    """Assemble AggregatedMetrics from per-condition tallies."""
+    accuracy = (correct / total * 100) if total > 0 else 0.0
+    cost_per_correct = (total_cost / correct) if correct > 0 else float('inf')
+
+    ci_low = ci_high = None
+    if HAS_NUMPY and total > 0:
+        ci_low, ci_high = _bootstrap_accuracy_ci(correct, total)
+
+    return AggregatedMetrics(
+        condition=condition,
+        total_questions=total,
+        correct_count=correct,
+        accuracy_pct=accuracy,
+        total_cost_usd=total_cost,
+        cost_per_correct_usd=cost_per_correct,
+        accuracy_ci_low=ci_low,
+        accuracy_ci_high=ci_high
+    )
+
+
 def aggregate_results(results: List[TestResult]) -> Dict[str, AggregatedMetrics]:
     """
     Aggregate results by condition.
-    
+
+    With numpy available the results are laid out as parallel arrays
+    (SoA) and each condition's counts and cost collapse to masked C-level
+    sums, cheap enough to call inside the progress loop for live
+    metrics. Pure-Python tallying remains as the fallback.
+
     Returns dict mapping condition name to aggregated metrics.
     """
+    if HAS_NUMPY and results:
+        n = len(results)
+        conditions = np.array([r.condition for r in results])
+        is_correct = np.fromiter((r.is_correct for r in results), dtype=bool, count=n)
+        cost_usd = np.fromiter((r.cost_usd for r in results), dtype=np.float64, count=n)
+
+        aggregated = {}
+        conds, inv = np.unique(conditions, return_inverse=True)
+        for i, condition in enumerate(conds):
+            mask = inv == i
+            aggregated[str(condition)] = _make_metrics(
+                str(condition),
+                int(mask.sum()),
+                int(is_correct[mask].sum()),
+                float(cost_usd[mask].sum())
+            )
+        return aggregated
+
     by_condition: Dict[str, List[TestResult]] = {}
     
     for result in results:
@@ -182,17 +446,7 @@ def aggregate_results(results: List[TestResult]) -> Dict[str, AggregatedMetrics]
         correct = sum(1 for r in cond_results if r.is_correct)
         total_cost = sum(r.cost_usd for r in cond_results)
         
-        accuracy = (correct / total * 100) if total > 0 else 0.0
-        cost_per_correct = (total_cost / correct) if correct > 0 else float('inf')
-        
-        aggregated[condition] = AggregatedMetrics(
-            condition=condition,
-            total_questions=total,
-            correct_count=correct,
-            accuracy_pct=accuracy,
-            total_cost_usd=total_cost,
-            cost_per_correct_usd=cost_per_correct
-        )
+        aggregated[condition] = _make_metrics(condition, total, correct, total_cost)
     
     return aggregated
 
@@ -205,24 +459,27 @@ def write_detailed_csv(results: List[TestResult], output_path: Path) -> None:
         'latency_sec', 'cost_usd'
     ]
     
-    with open(output_path, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for result in results:
-            writer.writerow({
-                'question_id': result.question_id,
-                'subject': result.subject,
-                'condition': result.condition,
-                'correct_answer': result.correct_answer,
-                'model_answer': result.model_answer,
-                'is_correct': 1 if result.is_correct else 0,
-                'input_tokens': result.input_tokens,
-                'output_tokens': result.output_tokens,
-                'latency_sec': f"{result.latency_sec:.3f}",
-                'cost_usd': f"{result.cost_usd:.6f}"
-            })
-    
+    # Plain csv.writer fed by one writerows call: no per-row dict build
+    # or fieldname lookup, and rows leave through a 1MB buffer
+    with open(output_path, 'w', newline='', buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(
+            (
+                r.question_id,
+                r.subject,
+                r.condition,
+                r.correct_answer,
+                r.model_answer,
+                1 if r.is_correct else 0,
+                r.input_tokens,
+                r.output_tokens,
+                f"{r.latency_sec:.3f}",
+                f"{r.cost_usd:.6f}"
+            )
+            for r in results
+        )
+
     logger.info(f"Wrote {len(results)} results to {output_path}")
 
 
@@ -263,6 +520,8 @@ def print_summary(aggregated: Dict[str, AggregatedMetrics]) -> None:
     if baseline:
         print("Baseline:")
         print(f"  Accuracy: {baseline.accuracy_pct:.1f}% ({baseline.correct_count}/{baseline.total_questions} correct)")
+        if baseline.accuracy_ci_low is not None:
+            print(f"  95% CI: [{baseline.accuracy_ci_low:.1f}%, {baseline.accuracy_ci_high:.1f}%]")
         print(f"  Total Cost: ${baseline.total_cost_usd:.4f}")
         if baseline.cost_per_correct_usd != float('inf'):
             print(f"  Cost per Correct Answer: ${baseline.cost_per_correct_usd:.4f}")
@@ -273,6 +532,8 @@ def print_summary(aggregated: Dict[str, AggregatedMetrics]) -> None:
     if scaffolded:
         print("Scaffolded:")
         print(f"  Accuracy: {scaffolded.accuracy_pct:.1f}% ({scaffolded.correct_count}/{scaffolded.total_questions} correct)")
+        if scaffolded.accuracy_ci_low is not None:
+            print(f"  95% CI: [{scaffolded.accuracy_ci_low:.1f}%, {scaffolded.accuracy_ci_high:.1f}%]")
         print(f"  Total Cost: ${scaffolded.total_cost_usd:.4f}")
         if scaffolded.cost_per_correct_usd != float('inf'):
             print(f"  Cost per Correct Answer: ${scaffolded.cost_per_correct_usd:.4f}")
@@ -0,0 +1,81 @@
+"""
+Persistent cache for LLM fallback answer extraction.
+
+Malformed model outputs repeat across runs and checkpoint resumes, so
+each distinct output should pay the fallback API round-trip at most
+once. Entries are keyed on a hash of the normalized response text and
+stored in a small SQLite file next to the code.
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+_DEFAULT_DB_PATH = Path(__file__).parent / "extraction_cache.db"
+
+# Collapse case, punctuation, and whitespace so trivially different
+# renderings ("The answer is A." vs "answer: a") share one cache entry
+_NORMALIZE_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and strip punctuation/whitespace runs for hashing."""
+    return _NORMALIZE_RE.sub(" ", text.lower()).strip()
+
+
+class ExtractionCache:
+    """SQLite-backed hash -> letter cache for fallback extraction."""
+
+    def __init__(self, db_path: Path = _DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            "hash TEXT PRIMARY KEY, letter TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        # In-process memo in front of SQLite: repeated raws (common when
+        # the same malformed output shows up across questions) skip the
+        # query entirely. Values are single letters, so it stays tiny.
+        self._memo: Dict[str, str] = {}
+
+    @staticmethod
+    def key(answer_text: str) -> str:
+        """Content-addressed key for a response text."""
+        return hashlib.sha256(_normalize(answer_text).encode()).hexdigest()
+
+    def get(self, answer_text: str) -> Optional[str]:
+        """Return the cached letter for this text, or None on miss."""
+        key = self.key(answer_text)
+        letter = self._memo.get(key)
+        if letter is not None:
+            return letter
+        row = self._conn.execute(
+            "SELECT letter FROM extractions WHERE hash = ?",
+            (key,)
+        ).fetchone()
+        if row:
+            self._memo[key] = row[0]
+            return row[0]
+        return None
+
+    def set(self, answer_text: str, letter: str) -> None:
+        """Store the extracted letter for this text."""
+        key = self.key(answer_text)
+        self._memo[key] = letter
+        self._conn.execute(
+            "INSERT OR REPLACE INTO extractions (hash, letter) VALUES (?, ?)",
+            (key, letter)
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        self._conn.close()
@@ -9,18 +9,27 @@ Usage:
 """
 
 import argparse
+import asyncio
 import logging
+import os
 import sys
+import time
 from pathlib import Path
 
 from tqdm import tqdm
 
-from config import load_config, BUDGET_CEILING_USD, RANDOM_SEED, DEFAULT_SAMPLE_SIZE
-from data_loader import load_and_sample, Question
-from api_client import APIClient, BudgetExceededError
+from config import (
+    load_config,
+    BUDGET_CEILING_USD,
+    RANDOM_SEED,
+    DEFAULT_SAMPLE_SIZE,
+    MAX_CONCURRENT_REQUESTS
+)
+from data_loader import load_and_sample, build_subject_index, Question
+from api_client import AsyncAPIClient, BudgetExceededError
 from checkpoint import CheckpointManager
 from evaluator import (
-    run_question_ab_test,
+    run_question_ab_test_async,
     aggregate_results,
     write_detailed_csv,
     write_summary_csv,
@@ -69,6 +78,12 @@ def parse_args() -> argparse.Namespace:
         help="Clear existing checkpoint and start fresh"
     )
     
+    parser.add_argument(
+        "--use-cache",
+        action="store_true",
+        help="Persist API responses to SQLite so identical prompts skip the API on re-runs"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -78,6 +93,18 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+_DATA_SUFFIXES = frozenset({".parquet", ".json", ".jsonl"})
+
+
+def _has_data(directory: Path) -> bool:
+    """Check whether a directory contains any data files, stopping at the first hit."""
+    with os.scandir(directory) as entries:
+        return any(
+            entry.is_file() and Path(entry.name).suffix in _DATA_SUFFIXES
+            for entry in entries
+        )
+
+
 def find_data_directory() -> Path:
     """Find the MMLU-Pro data directory."""
     # Check common locations
@@ -89,31 +116,91 @@ def find_data_directory() -> Path:
         Path.cwd() / "MMLU-Pro",
         Path.cwd() / "data",
     ]
-    
+
     for candidate in candidates:
-        if candidate.exists() and candidate.is_dir():
-            # Check if it has data files
-            has_files = any(
-                candidate.glob("*.parquet") or 
-                candidate.glob("*.json") or
-                candidate.glob("*.jsonl")
-            )
-            if has_files:
+        if candidate.is_dir():
+            if _has_data(candidate):
                 return candidate
             # Check subdirectories
             for subdir in candidate.iterdir():
-                if subdir.is_dir():
-                    has_files = any(
-                        subdir.glob("*.parquet") or 
-                        subdir.glob("*.json") or
-                        subdir.glob("*.jsonl")
-                    )
-                    if has_files:
-                        return candidate
-    
+                if subdir.is_dir() and _has_data(subdir):
+                    return candidate
+
     return None
 
 
+async def run_remaining_questions(
+    client: AsyncAPIClient,
+    questions: list,
+    scaffolding,
+    checkpoint: CheckpointManager
+) -> tuple:
+    """
+    Fan out all remaining questions under a bounded semaphore.
+
+    Baseline and scaffolded calls for each question run concurrently
+    (see run_question_ab_test_async); the semaphore is acquired around
+    each individual API call, so at most MAX_CONCURRENT_REQUESTS
+    requests are in flight at once and total wall time is network-bound
+    latency divided by the concurrency limit instead of a serial sum.
+
+    Returns (questions_processed, questions_failed, budget_exceeded).
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    questions_processed = 0
+    questions_failed = 0
+    budget_exceeded = False
+
+    async def run_one(question: Question):
+        results = await run_question_ab_test_async(
+            client, question, scaffolding, semaphore=semaphore
+        )
+        return question, results
+
+    tasks = [asyncio.create_task(run_one(q)) for q in questions]
+
+    # Postfix rendering (string formatting + terminal writes) is
+    # throttled so tqdm never becomes the serialization point when
+    # completions arrive in bursts
+    last_postfix = 0.0
+
+    with tqdm(total=len(tasks), desc="Testing", unit="question", mininterval=0.5) as pbar:
+        for future in asyncio.as_completed(tasks):
+            try:
+                question, (baseline_result, scaffolded_result) = await future
+            except BudgetExceededError as e:
+                print(f"\n\n⚠️  {e}")
+                budget_exceeded = True
+                for task in tasks:
+                    task.cancel()
+                break
+            except asyncio.CancelledError:
+                continue
+            except Exception as e:
+                logger.error(f"Question failed: {e}")
+                questions_failed += 1
+                pbar.update(1)
+                continue
+
+            # Save checkpoint as each question completes
+            checkpoint.save_question(
+                question.question_id,
+                baseline_result,
+                scaffolded_result
+            )
+            questions_processed += 1
+            pbar.update(1)
+            now = time.monotonic()
+            if now - last_postfix > 0.5:
+                last_postfix = now
+                pbar.set_postfix({
+                    'cost': f"${client.cumulative_cost:.3f}",
+                    'subject': question.subject[:15]
+                })
+
+    return questions_processed, questions_failed, budget_exceeded
+
+
 def main() -> int:
     """Main entry point."""
     args = parse_args()
@@ -176,9 +263,9 @@ def main() -> int:
         print("❌ No questions loaded!")
         return 1
     
-    # Get unique subjects
-    subjects = set(q.subject for q in questions)
-    print(f"✓ Loaded {len(questions)} questions from {len(subjects)} subjects")
+    # One-pass subject index; reused wherever per-subject slicing is needed
+    subject_index = build_subject_index(questions)
+    print(f"✓ Loaded {len(questions)} questions from {len(subject_index)} subjects")
     
     # Initialize checkpoint manager
     checkpoint = CheckpointManager(checkpoint_path)
@@ -207,7 +294,9 @@ def main() -> int:
     print(f"📝 {len(remaining_questions)} questions to process\n")
     
     # Initialize API client
-    client = APIClient(config.api_key, dry_run=args.dry_run)
+    client = AsyncAPIClient(
+        config.api_key, dry_run=args.dry_run, persistent_cache=args.use_cache
+    )
     
     # Restore cumulative cost from checkpoint
     prior_cost = checkpoint.get_cumulative_cost()
@@ -217,50 +306,26 @@ def main() -> int:
     
     print(f"💰 Budget ceiling: ${BUDGET_CEILING_USD:.2f}\n")
     
-    # Run tests with progress bar
+    # Run tests concurrently with progress bar
     budget_exceeded = False
     questions_processed = 0
     questions_failed = 0
     
     try:
-        with tqdm(remaining_questions, desc="Testing", unit="question") as pbar:
-            for question in pbar:
-                try:
-                    # Update progress bar description
-                    pbar.set_postfix({
-                        'cost': f"${client.cumulative_cost:.3f}",
-                        'subject': question.subject[:15]
-                    })
-                    
-                    # Run baseline and scaffolded tests
-                    baseline_result, scaffolded_result = run_question_ab_test(
-                        client, question, config.scaffolding
-                    )
-                    
-                    # Save checkpoint
-                    checkpoint.save_question(
-                        question.question_id,
-                        baseline_result,
-                        scaffolded_result
-                    )
-                    
-                    questions_processed += 1
-                    
-                except BudgetExceededError as e:
-                    print(f"\n\n⚠️  {e}")
-                    budget_exceeded = True
-                    break
-                    
-                except Exception as e:
-                    logger.error(f"Failed on question {question.question_id}: {e}")
-                    questions_failed += 1
-                    # Continue with next question
-                    continue
+        questions_processed, questions_failed, budget_exceeded = asyncio.run(
+            run_remaining_questions(
+                client, remaining_questions, config.scaffolding, checkpoint
+            )
+        )
     
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrupted by user")
         print("Progress has been saved to checkpoint.")
-    
+
+    finally:
+        # Make any buffered checkpoint lines durable before reporting
+        checkpoint.flush()
+
     # Generate final reports
     print("\n\n📊 Generating reports...")
     
@@ -284,17 +349,19 @@ def main() -> int:
     scaffolded = aggregated.get('scaffolded')
     if baseline and scaffolded:
         generate_html_report(
-            baseline_accuracy=baseline.accuracy_pct,
-            baseline_correct=baseline.correct_count,
-            baseline_total=baseline.total_questions,
-            baseline_cost=baseline.total_cost_usd,
-            baseline_cost_per_correct=baseline.cost_per_correct_usd,
-            scaffolded_accuracy=scaffolded.accuracy_pct,
-            scaffolded_correct=scaffolded.correct_count,
-            scaffolded_total=scaffolded.total_questions,
-            scaffolded_cost=scaffolded.total_cost_usd,
-            scaffolded_cost_per_correct=scaffolded.cost_per_correct_usd,
-            scaffolding_prompt=config.scaffolding.pre_prompt,
+            {
+                'baseline_accuracy': baseline.accuracy_pct,
+                'baseline_correct': baseline.correct_count,
+                'baseline_total': baseline.total_questions,
+                'baseline_cost': baseline.total_cost_usd,
+                'baseline_cost_per_correct': baseline.cost_per_correct_usd,
+                'scaffolded_accuracy': scaffolded.accuracy_pct,
+                'scaffolded_correct': scaffolded.correct_count,
+                'scaffolded_total': scaffolded.total_questions,
+                'scaffolded_cost': scaffolded.total_cost_usd,
+                'scaffolded_cost_per_correct': scaffolded.cost_per_correct_usd,
+                'scaffolding_prompt': config.scaffolding.pre_prompt,
+            },
             output_path=report_path
         )
         print(f"✓ HTML Report: {report_path}")
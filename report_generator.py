@@ -4,67 +4,38 @@ HTML Report Generator for MMLU-Pro A/B Test Results.
 Generates a standalone HTML artifact with visual comparison of baseline vs scaffolded results.
 """
 
-from datetime import datetime
+import os
+import re
+import tempfile
+import time
+from functools import lru_cache
+from html import escape
 from pathlib import Path
-from typing import Dict, Optional
-
-
-def generate_html_report(
-    baseline_accuracy: float,
-    baseline_correct: int,
-    baseline_total: int,
-    baseline_cost: float,
-    baseline_cost_per_correct: float,
-    scaffolded_accuracy: float,
-    scaffolded_correct: int,
-    scaffolded_total: int,
-    scaffolded_cost: float,
-    scaffolded_cost_per_correct: float,
-    scaffolding_prompt: str,
-    output_path: Path
-) -> None:
-    """Generate an HTML report comparing baseline vs scaffolded results."""
-    
-    accuracy_delta = scaffolded_accuracy - baseline_accuracy
-    accuracy_delta_sign = "+" if accuracy_delta >= 0 else ""
-    accuracy_delta_class = "positive" if accuracy_delta >= 0 else "negative"
-    
-    cost_delta = scaffolded_cost - baseline_cost
-    cost_delta_sign = "+" if cost_delta >= 0 else ""
-    
-    # Format cost per correct
-    baseline_cpc = f"${baseline_cost_per_correct:.4f}" if baseline_cost_per_correct != float('inf') else "N/A"
-    scaffolded_cpc = f"${scaffolded_cost_per_correct:.4f}" if scaffolded_cost_per_correct != float('inf') else "N/A"
-    
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>MMLU-Pro A/B Test Results</title>
-    <style>
-        * {{
+from typing import Any, Dict
+
+
+# Static stylesheet, kept out of the template so the template itself
+# needs no brace escaping and the CSS is built exactly once at import
+_STYLE = '''        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
-        
-        body {{
+        }
+
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, sans-serif;
             background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
             min-height: 100vh;
             padding: 40px 20px;
             color: #e0e0e0;
-        }}
-        
-        .container {{
+        }
+
+        .container {
             max-width: 900px;
             margin: 0 auto;
-        }}
-        
-        h1 {{
+        }
+
+        h1 {
             text-align: center;
             font-size: 2.2rem;
             margin-bottom: 10px;
@@ -72,153 +43,153 @@ def generate_html_report(
             -webkit-background-clip: text;
             -webkit-text-fill-color: transparent;
             background-clip: text;
-        }}
-        
-        .timestamp {{
+        }
+
+        .timestamp {
             text-align: center;
             color: #888;
             margin-bottom: 30px;
             font-size: 0.9rem;
-        }}
-        
-        .cards {{
+        }
+
+        .cards {
             display: grid;
             grid-template-columns: 1fr 1fr;
             gap: 20px;
             margin-bottom: 30px;
-        }}
-        
-        .card {{
+        }
+
+        .card {
             background: rgba(255, 255, 255, 0.05);
             border-radius: 16px;
             padding: 25px;
             backdrop-filter: blur(10px);
             border: 1px solid rgba(255, 255, 255, 0.1);
-        }}
-        
-        .card.baseline {{
+        }
+
+        .card.baseline {
             border-left: 4px solid #3498db;
-        }}
-        
-        .card.scaffolded {{
+        }
+
+        .card.scaffolded {
             border-left: 4px solid #9b59b6;
-        }}
-        
-        .card-title {{
+        }
+
+        .card-title {
             font-size: 1rem;
             text-transform: uppercase;
             letter-spacing: 1px;
             color: #888;
             margin-bottom: 15px;
-        }}
-        
-        .accuracy {{
+        }
+
+        .accuracy {
             font-size: 3rem;
             font-weight: 700;
             margin-bottom: 10px;
-        }}
-        
-        .baseline .accuracy {{
+        }
+
+        .baseline .accuracy {
             color: #3498db;
-        }}
-        
-        .scaffolded .accuracy {{
+        }
+
+        .scaffolded .accuracy {
             color: #9b59b6;
-        }}
-        
-        .correct-count {{
+        }
+
+        .correct-count {
             color: #aaa;
             margin-bottom: 20px;
-        }}
-        
-        .metric {{
+        }
+
+        .metric {
             display: flex;
             justify-content: space-between;
             padding: 10px 0;
             border-top: 1px solid rgba(255, 255, 255, 0.1);
-        }}
-        
-        .metric-label {{
+        }
+
+        .metric-label {
             color: #888;
-        }}
-        
-        .metric-value {{
+        }
+
+        .metric-value {
             font-weight: 600;
-        }}
-        
-        .bar-container {{
+        }
+
+        .bar-container {
             height: 8px;
             background: rgba(255, 255, 255, 0.1);
             border-radius: 4px;
             margin: 10px 0 20px;
             overflow: hidden;
-        }}
-        
-        .bar {{
+        }
+
+        .bar {
             height: 100%;
             border-radius: 4px;
             transition: width 0.5s ease;
-        }}
-        
-        .baseline .bar {{
+        }
+
+        .baseline .bar {
             background: linear-gradient(90deg, #3498db, #2980b9);
-        }}
-        
-        .scaffolded .bar {{
+        }
+
+        .scaffolded .bar {
             background: linear-gradient(90deg, #9b59b6, #8e44ad);
-        }}
-        
-        .delta-card {{
+        }
+
+        .delta-card {
             background: rgba(255, 255, 255, 0.05);
             border-radius: 16px;
             padding: 25px;
             text-align: center;
             border: 1px solid rgba(255, 255, 255, 0.1);
             margin-bottom: 30px;
-        }}
-        
-        .delta-title {{
+        }
+
+        .delta-title {
             font-size: 1rem;
             text-transform: uppercase;
             letter-spacing: 1px;
             color: #888;
             margin-bottom: 15px;
-        }}
-        
-        .delta-value {{
+        }
+
+        .delta-value {
             font-size: 2.5rem;
             font-weight: 700;
-        }}
-        
-        .delta-value.positive {{
+        }
+
+        .delta-value.positive {
             color: #2ecc71;
-        }}
-        
-        .delta-value.negative {{
+        }
+
+        .delta-value.negative {
             color: #e74c3c;
-        }}
-        
-        .delta-label {{
+        }
+
+        .delta-label {
             color: #888;
             margin-top: 5px;
-        }}
-        
-        .prompt-card {{
+        }
+
+        .prompt-card {
             background: rgba(255, 255, 255, 0.05);
             border-radius: 16px;
             padding: 25px;
             border: 1px solid rgba(255, 255, 255, 0.1);
-        }}
-        
-        .prompt-title {{
+        }
+
+        .prompt-title {
             font-size: 1rem;
             text-transform: uppercase;
             letter-spacing: 1px;
             color: #888;
             margin-bottom: 15px;
-        }}
-        
-        .prompt-text {{
+        }
+
+        .prompt-text {
             background: rgba(0, 0, 0, 0.3);
             padding: 15px;
             border-radius: 8px;
@@ -226,24 +197,49 @@ def generate_html_report(
             font-size: 0.9rem;
             color: #a0a0a0;
             line-height: 1.5;
-        }}
-        
-        @media (max-width: 600px) {{
-            .cards {{
+        }
+
+        @media (max-width: 600px) {
+            .cards {
                 grid-template-columns: 1fr;
-            }}
-            
-            .accuracy {{
+            }
+
+            .accuracy {
                 font-size: 2.5rem;
-            }}
-        }}
+            }
+        }'''
+
+# Minify once at import: the pretty-printed block above stays readable
+# in source, while every written report carries ~3x fewer style bytes
+_STYLE = (
+    re.sub(r"\s+", " ", _STYLE)
+    .replace("; ", ";")
+    .replace(": ", ":")
+    .replace(" {", "{")
+    .replace("{ ", "{")
+    .replace("} ", "}")
+    .strip()
+)
+
+
+# Report skeleton compiled once at import; rendering is a single
+# format_map over the context dict instead of rebuilding the whole
+# document as a per-call f-string
+_REPORT_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>MMLU-Pro A/B Test Results</title>
+    <style>
+{style}
     </style>
 </head>
 <body>
     <div class="container">
         <h1>MMLU-Pro A/B Test Results</h1>
         <p class="timestamp">Generated: {timestamp}</p>
-        
+
         <div class="cards">
             <div class="card baseline">
                 <div class="card-title">Baseline (No Scaffolding)</div>
@@ -261,7 +257,7 @@ def generate_html_report(
                     <span class="metric-value">{baseline_cpc}</span>
                 </div>
             </div>
-            
+
             <div class="card scaffolded">
                 <div class="card-title">Scaffolded</div>
                 <div class="accuracy">{scaffolded_accuracy:.1f}%</div>
@@ -279,20 +275,99 @@ def generate_html_report(
                 </div>
             </div>
         </div>
-        
+
         <div class="delta-card">
             <div class="delta-title">Accuracy Delta (Scaffolded vs Baseline)</div>
             <div class="delta-value {accuracy_delta_class}">{accuracy_delta_sign}{accuracy_delta:.1f}%</div>
-            <div class="delta-label">{"Scaffolding improved accuracy" if accuracy_delta > 0 else "Scaffolding reduced accuracy" if accuracy_delta < 0 else "No change in accuracy"}</div>
+            <div class="delta-label">{accuracy_delta_label}</div>
         </div>
-        
+
         <div class="prompt-card">
             <div class="prompt-title">Scaffolding Prompt Used</div>
-            <div class="prompt-text">{scaffolding_prompt or "(No scaffolding prompt configured)"}</div>
+            <div class="prompt-text">{scaffolding_prompt}</div>
         </div>
     </div>
 </body>
 </html>'''
-    
-    with open(output_path, 'w') as f:
-        f.write(html)
+
+
+# Indexed by sign(accuracy_delta): 0 = no change, 1 = improved, -1 = reduced
+_DELTA_LABELS = (
+    "No change in accuracy",
+    "Scaffolding improved accuracy",
+    "Scaffolding reduced accuracy",
+)
+
+_DELTA_CLASSES = ("negative", "positive")
+
+
+# strftime result cached at one-second granularity; batch sweeps that
+# write many reports in a burst format the timestamp once per second
+_last_ts_epoch = 0
+_last_ts_str = ""
+
+
+def _timestamp() -> str:
+    global _last_ts_epoch, _last_ts_str
+    now = int(time.time())
+    if now != _last_ts_epoch:
+        _last_ts_epoch = now
+        _last_ts_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+    return _last_ts_str
+
+
+@lru_cache(maxsize=32)
+def _escaped_prompt(prompt: str) -> str:
+    """HTML-escape a prompt, memoized since A/B sweeps reuse the same one."""
+    return escape(prompt, quote=False)
+
+
+def generate_html_report(ctx: Dict[str, Any], output_path: Path) -> None:
+    """
+    Generate an HTML report comparing baseline vs scaffolded results.
+
+    ctx carries the raw metrics: baseline_accuracy, baseline_correct,
+    baseline_total, baseline_cost, baseline_cost_per_correct, the
+    scaffolded_* equivalents, and scaffolding_prompt. Derived fields
+    (deltas, labels, timestamp) are computed here, and the document is
+    rendered in one format_map pass over the precompiled template.
+    """
+    accuracy_delta = ctx['scaffolded_accuracy'] - ctx['baseline_accuracy']
+    cost_delta = ctx['scaffolded_cost'] - ctx['baseline_cost']
+
+    # Branchless selection: bools index the tuples directly
+    accuracy_improved = accuracy_delta >= 0
+
+    baseline_cpc = ctx['baseline_cost_per_correct']
+    scaffolded_cpc = ctx['scaffolded_cost_per_correct']
+
+    render_ctx = dict(ctx)
+    render_ctx.update(
+        style=_STYLE,
+        timestamp=_timestamp(),
+        accuracy_delta=accuracy_delta,
+        accuracy_delta_sign="+" * accuracy_improved,
+        accuracy_delta_class=_DELTA_CLASSES[accuracy_improved],
+        accuracy_delta_label=_DELTA_LABELS[(accuracy_delta > 0) - (accuracy_delta < 0)],
+        cost_delta=cost_delta,
+        cost_delta_sign="+" * (cost_delta >= 0),
+        baseline_cpc=f"${baseline_cpc:.4f}" if baseline_cpc != float('inf') else "N/A",
+        scaffolded_cpc=f"${scaffolded_cpc:.4f}" if scaffolded_cpc != float('inf') else "N/A",
+        scaffolding_prompt=_escaped_prompt(
+            ctx.get('scaffolding_prompt') or "(No scaffolding prompt configured)"
+        )
+    )
+
+    # Render, then publish atomically: a reader (or a crashed run) never
+    # sees a half-written report
+    html = _REPORT_TEMPLATE.format_map(render_ctx)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=output_path.parent, prefix=output_path.name, suffix=".tmp"
+    )
+    try:
+        with open(fd, 'w', buffering=1 << 16) as f:
+            f.write(html)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
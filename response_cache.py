@@ -0,0 +1,77 @@
+"""
+Persistent prompt -> response cache for repeated A/B runs.
+
+The baseline condition is byte-identical across scaffolding iterations,
+so re-runs can skip its API calls entirely. Responses are stored in a
+small SQLite file keyed on the client's content-addressed cache key
+(model + system prompt + prefix + user message).
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+_DEFAULT_DB_PATH = Path(__file__).parent / "response_cache.sqlite"
+
+
+class ResponseCache:
+    """
+    SQLite-backed key -> response-row cache.
+
+    Deals in plain field tuples so it stays import-free of the API
+    client; the client reassembles its APIResponse from the row.
+    """
+
+    def __init__(self, db_path: Path = _DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, "
+            "answer_text TEXT NOT NULL, "
+            "input_tokens INTEGER NOT NULL, "
+            "output_tokens INTEGER NOT NULL, "
+            "latency_sec REAL NOT NULL, "
+            "cost_usd REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, int, int, float, float]]:
+        """
+        Look up a cached response row.
+
+        Returns (answer_text, input_tokens, output_tokens, latency_sec,
+        cost_usd) or None on miss.
+        """
+        return self._conn.execute(
+            "SELECT answer_text, input_tokens, output_tokens, latency_sec, cost_usd "
+            "FROM responses WHERE key = ?",
+            (key,)
+        ).fetchone()
+
+    def set(
+        self,
+        key: str,
+        answer_text: str,
+        input_tokens: int,
+        output_tokens: int,
+        latency_sec: float,
+        cost_usd: float
+    ) -> None:
+        """Store a response row under its content key."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(key, answer_text, input_tokens, output_tokens, latency_sec, cost_usd) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, answer_text, input_tokens, output_tokens, latency_sec, cost_usd)
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        self._conn.close()
@@ -4,8 +4,9 @@ Show actual model responses for a few sample questions.
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from api_client import APIClient
-from data_loader import load_mmlu_pro_data
+from data_loader import load_mmlu_pro_data_cached
 from pathlib import Path
 
 # Load API key
@@ -16,7 +17,7 @@ if not api_key:
 
 # Load questions
 data_dir = Path(__file__).parent / "MMLU-Pro" / "data"
-questions = load_mmlu_pro_data(data_dir)
+questions = load_mmlu_pro_data_cached(data_dir)
 
 # Take first 5 questions
 sample_questions = questions[:5]
@@ -32,11 +33,27 @@ SCAFFOLDING = "Read carefully. Identify the key concept being tested. Eliminate
 
 client = APIClient(api_key)
 
+# Build all messages up front, then fan out every request at once so the
+# wall time is one round trip instead of 2N sequential ones
+_SCAFFOLD_PREFIX = SCAFFOLDING + "\n\n"
+
+messages = []
+for q in sample_questions:
+    body = q.question_text + "\n\n" + q.format_options()
+    messages.append(body)                       # baseline
+    messages.append(_SCAFFOLD_PREFIX + body)    # scaffolded
+
+with ThreadPoolExecutor(max_workers=10) as pool:
+    responses = list(pool.map(lambda msg: client.call(SYSTEM_PROMPT, msg), messages))
+
 print("=" * 100)
 print("ACTUAL MODEL RESPONSES - BASELINE vs SCAFFOLDED")
 print("=" * 100)
 
 for i, q in enumerate(sample_questions):
+    baseline_resp = responses[2 * i]
+    scaffolded_resp = responses[2 * i + 1]
+
     print(f"\n{'='*100}")
     print(f"Question {i+1} - {q.subject.upper()}")
     print(f"{'='*100}")
@@ -44,19 +61,11 @@ for i, q in enumerate(sample_questions):
     print()
     print(q.format_options()[:300] + "...")
     print(f"\n✓ Correct Answer: {q.correct_answer}")
-    
-    # Baseline
-    baseline_msg = q.question_text + "\n\n" + q.format_options()
-    baseline_resp = client.call(SYSTEM_PROMPT, baseline_msg)
-    
-    # Scaffolded
-    scaffolded_msg = SCAFFOLDING + "\n\n" + q.question_text + "\n\n" + q.format_options()
-    scaffolded_resp = client.call(SYSTEM_PROMPT, scaffolded_msg)
-    
+
     print(f"\n{'─'*96}")
     print(f"BASELINE Response ({baseline_resp.output_tokens} tokens):")
     print(f"Raw output: \"{baseline_resp.answer_text}\"")
-    
+
     print(f"\n{'─'*96}")
     print(f"SCAFFOLDED Response ({scaffolded_resp.output_tokens} tokens):")
     print(f"Raw output: \"{scaffolded_resp.answer_text}\"")
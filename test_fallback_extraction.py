@@ -5,8 +5,10 @@ Test with LLM fallback extraction - show all outputs.
 
 import os
 import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from api_client import APIClient, extract_answer, extract_answer_with_llm_fallback
-from data_loader import load_mmlu_pro_data
+from data_loader import load_mmlu_pro_data_cached
 from pathlib import Path
 
 api_key = os.environ.get("ANTHROPIC_API_KEY")
@@ -15,7 +17,7 @@ if not api_key:
     exit(1)
 
 data_dir = Path(__file__).parent / "MMLU-Pro" / "data"
-questions = load_mmlu_pro_data(data_dir)
+questions = load_mmlu_pro_data_cached(data_dir)
 
 random.seed(777)  # New seed for fresh questions
 sample_questions = random.sample(questions, 5)
@@ -32,6 +34,9 @@ IMPORTANT: Your response must be ONLY a single letter (A-J). No explanation. No
 
 """
 
+# O(1) membership test for the validity counts below
+_VALID_LETTERS = frozenset("ABCDEFGHIJ")
+
 client = APIClient(api_key)
 
 print("=" * 100)
@@ -39,36 +44,48 @@ print("LLM FALLBACK EXTRACTION TEST - 20 QUESTIONS")
 print("=" * 100)
 print()
 
+# Stage 1: fan out every baseline + scaffolded request at once; the run
+# is latency-bound, so wall time collapses to roughly one round trip
+messages = []
+for q in sample_questions:
+    question_with_options = q.question_text + "\n\n" + q.format_options()
+    messages.append(question_with_options)            # baseline
+    messages.append(SCAFFOLDING + question_with_options)  # scaffolded
+
+with ThreadPoolExecutor(max_workers=10) as pool:
+    responses = list(pool.map(lambda msg: client.call(SYSTEM_PROMPT, msg), messages))
+
+    # Stage 2: extraction. Regex hits return without I/O; only malformed
+    # outputs pay the fallback round trip, still concurrently
+    extraction_args = [
+        (responses[k].answer_text, sample_questions[k // 2])
+        for k in range(len(responses))
+    ]
+    extracted = list(pool.map(
+        lambda args: extract_answer_with_llm_fallback(
+            args[0], client, args[1].question_text, args[1].format_options()
+        ),
+        extraction_args
+    ))
+
 baseline_results = []
 scaffolded_results = []
 
 for i, q in enumerate(sample_questions):
-    print(f"Q{i+1:02d} [{q.subject.upper()[:10]:10s}] ", end="", flush=True)
-    
-    question_with_options = q.question_text + "\n\n" + q.format_options()
-    
-    # BASELINE
-    baseline_resp = client.call(SYSTEM_PROMPT, question_with_options)
-    baseline_raw = baseline_resp.answer_text
-    baseline_extracted = extract_answer_with_llm_fallback(
-        baseline_raw, client, q.question_text, q.format_options()
-    )
+    baseline_raw = responses[2 * i].answer_text
+    baseline_extracted = extracted[2 * i]
     baseline_correct = baseline_extracted == q.correct_answer
     baseline_results.append((baseline_raw, baseline_extracted, baseline_correct))
-    
-    # SCAFFOLDED
-    scaffolded_msg = SCAFFOLDING + question_with_options
-    scaffolded_resp = client.call(SYSTEM_PROMPT, scaffolded_msg)
-    scaffolded_raw = scaffolded_resp.answer_text
-    scaffolded_extracted = extract_answer_with_llm_fallback(
-        scaffolded_raw, client, q.question_text, q.format_options()
-    )
+
+    scaffolded_raw = responses[2 * i + 1].answer_text
+    scaffolded_extracted = extracted[2 * i + 1]
     scaffolded_correct = scaffolded_extracted == q.correct_answer
     scaffolded_results.append((scaffolded_raw, scaffolded_extracted, scaffolded_correct))
-    
+
     # Quick inline status
     b_mark = "✓" if baseline_correct else "✗"
     s_mark = "✓" if scaffolded_correct else "✗"
+    print(f"Q{i+1:02d} [{q.subject.upper()[:10]:10s}] ", end="")
     print(f"Correct: {q.correct_answer} | Base: {baseline_extracted} {b_mark} | Scaff: {scaffolded_extracted} {s_mark}")
 
 print()
@@ -76,13 +93,17 @@ print("=" * 100)
 print("DETAILED RESULTS")
 print("=" * 100)
 
+# Accumulate the detail lines and emit them in one write instead of six
+# print calls (and six stdout flushes) per question
+buf = []
 for i, q in enumerate(sample_questions):
     b_raw, b_ext, b_ok = baseline_results[i]
     s_raw, s_ext, s_ok = scaffolded_results[i]
-    
-    print(f"\n--- Q{i+1}: {q.subject.upper()} (Correct: {q.correct_answer}) ---")
-    print(f"  BASELINE:   Raw=\"{b_raw[:50]}{'...' if len(b_raw) > 50 else ''}\" → {b_ext} {'✓' if b_ok else '✗'}")
-    print(f"  SCAFFOLDED: Raw=\"{s_raw[:50]}{'...' if len(s_raw) > 50 else ''}\" → {s_ext} {'✓' if s_ok else '✗'}")
+
+    buf.append(f"\n--- Q{i+1}: {q.subject.upper()} (Correct: {q.correct_answer}) ---\n")
+    buf.append(f"  BASELINE:   Raw=\"{b_raw[:50]}{'...' if len(b_raw) > 50 else ''}\" → {b_ext} {'✓' if b_ok else '✗'}\n")
+    buf.append(f"  SCAFFOLDED: Raw=\"{s_raw[:50]}{'...' if len(s_raw) > 50 else ''}\" → {s_ext} {'✓' if s_ok else '✗'}\n")
+sys.stdout.write("".join(buf))
 
 print()
 print("=" * 100)
@@ -91,8 +112,8 @@ print("=" * 100)
 
 baseline_correct_count = sum(1 for _, _, ok in baseline_results if ok)
 scaffolded_correct_count = sum(1 for _, _, ok in scaffolded_results if ok)
-baseline_valid = sum(1 for _, ext, _ in baseline_results if ext in 'ABCDEFGHIJ')
-scaffolded_valid = sum(1 for _, ext, _ in scaffolded_results if ext in 'ABCDEFGHIJ')
+baseline_valid = sum(1 for _, ext, _ in baseline_results if ext in _VALID_LETTERS)
+scaffolded_valid = sum(1 for _, ext, _ in scaffolded_results if ext in _VALID_LETTERS)
 
 print(f"\n  Baseline:   {baseline_correct_count}/20 correct ({baseline_correct_count*5}%)  |  Valid answers: {baseline_valid}/20")
 print(f"  Scaffolded: {scaffolded_correct_count}/20 correct ({scaffolded_correct_count*5}%)  |  Valid answers: {scaffolded_valid}/20")
@@ -4,8 +4,10 @@ Test different scaffolding strategies to find one that doesn't break output form
 """
 
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from api_client import APIClient
-from data_loader import load_mmlu_pro_data
+from data_loader import load_mmlu_pro_data_cached
 from pathlib import Path
 import random
 
@@ -17,7 +19,7 @@ if not api_key:
 
 # Load questions
 data_dir = Path(__file__).parent / "MMLU-Pro" / "data"
-questions = load_mmlu_pro_data(data_dir)
+questions = load_mmlu_pro_data_cached(data_dir)
 
 # Random sample of 5 questions from different subjects
 random.seed(99)  # Different seed for new questions
@@ -41,8 +43,33 @@ IMPORTANT: Your response must be ONLY a single letter (A-J). No other text.
 
 """
 
+# First non-whitespace character, found by the C regex engine rather
+# than strip().upper()[:1] which copies the whole response twice
+_FIRST_CHAR = re.compile(r"\S").search
+
+
+def _first_letter(text: str) -> str:
+    m = _FIRST_CHAR(text)
+    return m.group(0).upper() if m else ""
+
+
 client = APIClient(api_key)
 
+# Fan out all 3 variants of every question at once; results come back in
+# submission order so the per-question report below stays identical
+# Prefix concatenated once, not per question
+_OLD_SCAFFOLD_PREFIX = OLD_SCAFFOLDING + "\n\n"
+
+messages = []
+for q in sample_questions:
+    question_with_options = q.question_text + "\n\n" + q.format_options()
+    messages.append(question_with_options)                        # baseline
+    messages.append(_OLD_SCAFFOLD_PREFIX + question_with_options)  # old
+    messages.append(NEW_SCAFFOLDING + question_with_options)      # new
+
+with ThreadPoolExecutor(max_workers=15) as pool:
+    responses = list(pool.map(lambda msg: client.call(SYSTEM_PROMPT, msg), messages))
+
 print("=" * 100)
 print("TESTING NEW SCAFFOLDING STRATEGY")
 print("=" * 100)
@@ -75,28 +102,24 @@ for i, q in enumerate(sample_questions):
         print(f"  ... ({len(q.options)-4} more options)")
     
     print(f"\n  ✓ Correct Answer: {q.correct_answer}")
-    
-    # Format question
-    question_with_options = q.question_text + "\n\n" + q.format_options()
-    
-    # 1. BASELINE
-    baseline_msg = question_with_options
-    baseline_resp = client.call(SYSTEM_PROMPT, baseline_msg)
-    baseline_is_correct = baseline_resp.answer_text.strip().upper() == q.correct_answer
+
+    # 1. BASELINE — exact match: the whole response must be the letter.
+    # Length-check before upper() so long explanations aren't copied
+    baseline_resp = responses[3 * i]
+    stripped = baseline_resp.answer_text.strip()
+    baseline_is_correct = len(stripped) == 1 and stripped.upper() == q.correct_answer
     if baseline_is_correct:
         baseline_correct += 1
-    
+
     # 2. OLD SCAFFOLDING
-    old_scaffolded_msg = OLD_SCAFFOLDING + "\n\n" + question_with_options
-    old_scaffolded_resp = client.call(SYSTEM_PROMPT, old_scaffolded_msg)
-    old_is_correct = old_scaffolded_resp.answer_text.strip().upper()[:1] == q.correct_answer
+    old_scaffolded_resp = responses[3 * i + 1]
+    old_is_correct = _first_letter(old_scaffolded_resp.answer_text) == q.correct_answer
     if old_is_correct:
         old_scaffolded_correct += 1
-    
+
     # 3. NEW SCAFFOLDING
-    new_scaffolded_msg = NEW_SCAFFOLDING + question_with_options
-    new_scaffolded_resp = client.call(SYSTEM_PROMPT, new_scaffolded_msg)
-    new_is_correct = new_scaffolded_resp.answer_text.strip().upper()[:1] == q.correct_answer
+    new_scaffolded_resp = responses[3 * i + 2]
+    new_is_correct = _first_letter(new_scaffolded_resp.answer_text) == q.correct_answer
     if new_is_correct:
         new_scaffolded_correct += 1
     